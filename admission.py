@@ -0,0 +1,72 @@
+"""
+Admission Control for EduLedger Certificate Management System
+Bounded lanes with their own concurrency limits, so write-heavy work (mining, signing) cannot starve reads
+"""
+
+import threading
+
+class Lane:
+    # At most `concurrency` requests run at once; up to `queue_size` more wait up to
+    # `queue_timeout` seconds for a slot. Anything beyond that is turned away at once.
+    def __init__(self, name: str, concurrency: int, queue_size: int, queue_timeout: float,
+                 retry_after: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        # Fast path: a free slot means no queueing at all
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.active += 1
+                self.admitted += 1
+            return True
+
+        with self._lock:
+            if self.waiting >= self.queue_size:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+
+        admitted = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self.waiting -= 1
+            if admitted:
+                self.active += 1
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        return admitted
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "rejected": self.rejected
+        }
+
+class AdmissionController:
+    def __init__(self, *lanes: Lane):
+        self.lanes = {lane.name: lane for lane in lanes}
+
+    def lane(self, name: str) -> Lane:
+        return self.lanes[name]
+
+    def stats(self) -> dict:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
@@ -0,0 +1,83 @@
+"""
+Issuance Analytics for EduLedger Certificate Management System
+Counters maintained incrementally on issue and revoke, so dashboard queries are O(1) lookups
+"""
+
+import threading
+from collections import Counter
+from typing import Dict
+
+# Each dimension maps a certificate to the key it is counted under
+DIMENSIONS = {
+    "issuer": lambda cert: cert.issuer,
+    "course": lambda cert: cert.course,
+    "grade": lambda cert: cert.grade,
+    "month": lambda cert: cert.issue_date[:7],
+    "student": lambda cert: cert.student_username,
+    "issuer_student": lambda cert: (cert.issuer, cert.student_username),
+    "course_month": lambda cert: (cert.course, cert.issue_date[:7]),
+    "issuer_month": lambda cert: (cert.issuer, cert.issue_date[:7]),
+}
+
+class IssuanceAnalytics:
+    def __init__(self):
+        self.issued = {dimension: Counter() for dimension in DIMENSIONS}
+        self.revoked = {dimension: Counter() for dimension in DIMENSIONS}
+        self.total_issued = 0
+        self.total_revoked = 0
+        self._lock = threading.Lock()
+
+    def record_issue(self, cert):
+        with self._lock:
+            self.total_issued += 1
+            for dimension, key_of in DIMENSIONS.items():
+                self.issued[dimension][key_of(cert)] += 1
+
+    def record_revoke(self, cert):
+        with self._lock:
+            self.total_revoked += 1
+            for dimension, key_of in DIMENSIONS.items():
+                self.revoked[dimension][key_of(cert)] += 1
+
+    def count(self, dimension: str, key, include_revoked: bool = False) -> int:
+        issued = self.issued[dimension][key]
+        if include_revoked:
+            return issued
+        return issued - self.revoked[dimension][key]
+
+    def breakdown(self, dimension: str, include_revoked: bool = False) -> Dict[str, int]:
+        issued = dict(self.issued[dimension])
+        if include_revoked:
+            return issued
+        revoked = self.revoked[dimension]
+        return {key: count - revoked[key] for key, count in issued.items()}
+
+    def to_state(self) -> dict:
+        # JSON-friendly form; compound keys are stored as lists
+        def encode(counters):
+            return {dim: [[list(k) if isinstance(k, tuple) else k, n] for k, n in c.items()]
+                    for dim, c in counters.items()}
+        with self._lock:
+            return {
+                "total_issued": self.total_issued,
+                "total_revoked": self.total_revoked,
+                "issued": encode(self.issued),
+                "revoked": encode(self.revoked)
+            }
+
+    def load_state(self, state: dict):
+        def decode(counters):
+            return {dim: Counter({tuple(k) if isinstance(k, list) else k: n for k, n in counters.get(dim, [])})
+                    for dim in DIMENSIONS}
+        with self._lock:
+            self.total_issued = state["total_issued"]
+            self.total_revoked = state["total_revoked"]
+            self.issued = decode(state["issued"])
+            self.revoked = decode(state["revoked"])
+
+    def summary(self) -> dict:
+        return {
+            "total_issued": self.total_issued,
+            "total_revoked": self.total_revoked,
+            "active": self.total_issued - self.total_revoked
+        }
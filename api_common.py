@@ -0,0 +1,135 @@
+"""
+API Helpers for EduLedger Certificate Management System
+Request parsing, validation and settings shared by the Flask (api_server) and ASGI (asgi_server) servers
+"""
+
+import base64
+import io
+from typing import Mapping, Optional, Tuple
+
+from certificate_system import (system, BLOCK_FIELDS, HEADER_FIELDS, EXPLORER_PAGE_SIZE, MAX_PAGE_SIZE,
+                                BULK_CHUNK_SIZE, MAX_BULK_CHUNK_SIZE)
+from event_stream import EVENT_TYPES, Subscription
+
+# Issuer used when a request does not name one
+DEFAULT_ISSUER = "issuer324"
+
+# PDF blobs are content-addressed and never change, so clients may keep them for a year
+PDF_MAX_AGE = 365 * 24 * 60 * 60
+
+# Batch verification: larger batches are answered as an NDJSON stream
+VERIFY_STREAM_THRESHOLD = 500
+MAX_VERIFY_BATCH = 10000
+
+# Bulk uploads are spooled before the response starts: in memory up to this size, on disk beyond
+BULK_SPOOL_SIZE = 8 * 1024 * 1024
+
+def resolve_issuer(issuer):
+    """Return the issuer username, or None if it is not a registered issuer"""
+    issuer = issuer or DEFAULT_ISSUER
+    user = system.users.get(issuer)
+    if user and user["role"] == "issuer":
+        return issuer
+    return None
+
+def issuance_error(issuer, data):
+    """Return (message, status code) if an issuance request is invalid, else None"""
+    if not issuer:
+        return "Invalid issuer", 400
+    if not data.get('student_name') or not data.get('course') or not data.get('grade'):
+        return "Student name, course, and grade are required", 400
+    if not data.get('student_username'):
+        return "Student username is required", 400
+    if data.get('student_username') not in system.users:
+        return "Student not found", 404
+    return None
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Return the token from an Authorization: Bearer header value, or None"""
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() == 'bearer' and token.strip():
+        return token.strip()
+    return None
+
+def int_param(args: Mapping, name: str) -> Optional[int]:
+    """Return a non-negative integer query parameter, None if absent; ValueError if malformed"""
+    value = args.get(name)
+    if value is None:
+        return None
+    if not value.isdigit():
+        raise ValueError(f"Invalid {name}")
+    return int(value)
+
+def page_params(args: Mapping) -> Optional[Tuple[Optional[str], Optional[int]]]:
+    """Return (cursor, limit) when the request asks for a page, else None for a full listing"""
+    if 'cursor' not in args and 'limit' not in args:
+        return None
+    return args.get('cursor'), int_param(args, 'limit')
+
+def explorer_params(args: Mapping):
+    """Return (from, to, limit, fields) for a block explorer request"""
+    limit = min(int_param(args, 'limit') or EXPLORER_PAGE_SIZE, MAX_PAGE_SIZE)
+    if args.get('fields'):
+        fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in BLOCK_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown block fields: {', '.join(unknown)}")
+    elif args.get('headers_only') in ('1', 'true'):
+        fields = HEADER_FIELDS
+    else:
+        fields = BLOCK_FIELDS
+    return int_param(args, 'from'), int_param(args, 'to'), limit, fields
+
+def bulk_chunk_size(args: Mapping) -> int:
+    """Return the rows per block for a bulk upload, capped at MAX_BULK_CHUNK_SIZE; ValueError below 1"""
+    chunk_size = int_param(args, 'chunk_size')
+    if chunk_size is None:
+        return BULK_CHUNK_SIZE
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    return min(chunk_size, MAX_BULK_CHUNK_SIZE)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value names this ETag, compared weakly (W/ prefixes ignored)"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix('W/').strip('"') for tag in if_none_match.split(',')}
+    return '*' in tags or etag in tags
+
+def tagged(response, etag: str):
+    """Attach a weak ETag and ask clients to revalidate on every poll"""
+    response.headers['ETag'] = f'W/"{etag}"'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def event_subscription(last_event_id: Optional[str], args: Mapping) -> Subscription:
+    """Return a Subscription for an event stream request, resuming from Last-Event-ID or since_height"""
+    last_event_id = last_event_id or args.get('last_event_id')
+    if last_event_id is not None and not last_event_id.isdigit():
+        raise ValueError("Invalid Last-Event-ID")
+    types = None
+    if args.get('types'):
+        types = [event_type.strip() for event_type in args['types'].split(',') if event_type.strip()]
+        unknown = [event_type for event_type in types if event_type not in EVENT_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown event types: {', '.join(unknown)}")
+    return system.subscribe_events(
+        last_event_id=int(last_event_id) if last_event_id else None,
+        since_height=int_param(args, 'since_height'),
+        types=types,
+        username=args.get('username') or None
+    )
+
+def decode_pdf_field(data: Mapping) -> Optional[io.BytesIO]:
+    """Return the PDF from a legacy JSON body's base64 pdf_file field, or None"""
+    pdf_data = data.get('pdf_file')
+    if not pdf_data:
+        return None
+    try:
+        # Remove data:application/pdf;base64, prefix if present
+        if pdf_data.startswith('data:'):
+            pdf_data = pdf_data.split(',')[1]
+        return io.BytesIO(base64.b64decode(pdf_data))
+    except Exception as e:
+        print(f"Error processing PDF: {e}")
+        return None
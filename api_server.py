@@ -3,27 +3,164 @@ API Server for EduLedger Certificate Management System
 Provides REST API endpoints for the Next.js frontend
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import shutil
 import sys
+import tempfile
+import time
 
 # Import the certificate system
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from certificate_system import system
+from certificate_system import system, iter_bulk_rows, block_view
+from response_encoding import (Fragment, json_fragment, dumps, compress, negotiate_encoding,
+                               should_compress)
+from session_store import SessionStore
+from admission import AdmissionController, Lane
+from metrics import REGISTRY, REQUEST_SECONDS, CONTENT_TYPE as METRICS_CONTENT_TYPE, Counter, Gauge
+from event_stream import KEEPALIVE, KEEPALIVE_INTERVAL, PREAMBLE, format_event
+from issuance_jobs import IdempotencyConflict, QueueFull, PENDING
+from api_common import (PDF_MAX_AGE, VERIFY_STREAM_THRESHOLD, MAX_VERIFY_BATCH, BULK_SPOOL_SIZE,
+                        resolve_issuer, issuance_error, bearer_token, int_param, page_params,
+                        explorer_params, bulk_chunk_size, etag_matches, tagged, event_subscription,
+                        decode_pdf_field)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify through response_encoding, so cached certificate JSON is spliced in as-is"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def response(self, *args, **kwargs):
+        return self._app.response_class(dumps(self._prepare_response_obj(args, kwargs)),
+                                        mimetype=self.mimetype)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Next.js frontend
+app.json = FastJSONProvider(app)
+# Behind Apache/lighttpd, EDULEDGER_X_SENDFILE=1 hands PDF downloads to the front server
+app.config['USE_X_SENDFILE'] = os.environ.get('EDULEDGER_X_SENDFILE') == '1'
+
+# Logged-in sessions, shared with every other worker process on this host
+sessions = SessionStore()
+
+# Admission control. Writes mine and sign, so only a few run at once and they queue
+# longer; reads get far more slots, so an issuance storm cannot starve them. Event
+# streams hold their slot for the life of the connection, so they get a lane of their own.
+admission = AdmissionController(
+    Lane("write", concurrency=2, queue_size=16, queue_timeout=10.0, retry_after=5),
+    Lane("read", concurrency=16, queue_size=64, queue_timeout=2.0, retry_after=1),
+    Lane("stream", concurrency=32, queue_size=0, queue_timeout=0.0, retry_after=10)
+)
+WRITE_ENDPOINTS = {'add_issuer', 'add_student', 'issue_certificate', 'issue_certificates_bulk', 'revoke_certificate'}
+STREAM_ENDPOINTS = {'stream_events'}
+EXEMPT_ENDPOINTS = {'health_check', 'get_metrics'}
+
+Gauge("eduledger_admission_active", "Requests running, per admission lane", ("lane",),
+      function=lambda: {(name,): lane.active for name, lane in admission.lanes.items()})
+Gauge("eduledger_admission_waiting", "Requests queued for a slot, per admission lane", ("lane",),
+      function=lambda: {(name,): lane.waiting for name, lane in admission.lanes.items()})
+Counter("eduledger_admission_rejected_total", "Requests turned away with 503, per admission lane", ("lane",),
+        function=lambda: {(name,): lane.rejected for name, lane in admission.lanes.items()})
+
+def not_modified(etag):
+    """Return a 304 response when If-None-Match already names this version, else None"""
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return tagged(Response(status=304), etag)
+    return None
+
+def certificate_upload():
+    """Return (fields, PDF stream or None) from a multipart, raw application/pdf or JSON request"""
+    if request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        upload = request.files.get('pdf_file')
+        return request.form, (upload.stream if upload and upload.filename else None)
+    
+    if request.mimetype == 'application/pdf':
+        # The body is the PDF itself and is read straight off the socket during
+        # ingest; the certificate fields travel in the query string
+        return request.args, (request.stream if request.content_length != 0 else None)
+    
+    # Legacy JSON body with the PDF base64-encoded in pdf_file
+    data = request.get_json(silent=True) or {}
+    return data, decode_pdf_field(data)
 
-# Global variable to track logged-in users
-logged_in_users = {}
+@app.before_request
+def start_timer():
+    """Note when the request arrived, for the latency histogram"""
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def admit_request():
+    """Hold the request for a slot in its lane, or turn it away with 503 and Retry-After"""
+    if request.method == 'OPTIONS' or request.endpoint is None or request.endpoint in EXEMPT_ENDPOINTS:
+        return None
+    if request.endpoint in WRITE_ENDPOINTS:
+        lane = admission.lane('write')
+    elif request.endpoint in STREAM_ENDPOINTS:
+        lane = admission.lane('stream')
+    else:
+        lane = admission.lane('read')
+    if not lane.acquire():
+        response = jsonify({"success": False, "message": "Server is busy, please retry shortly"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(lane.retry_after)
+        return response
+    g.admission_lane = lane
+    return None
+
+@app.after_request
+def release_admission(response):
+    """Free the lane slot, or for a streamed response once the stream is finished"""
+    lane = g.pop('admission_lane', None)
+    if lane is not None:
+        if response.is_streamed:
+            response.call_on_close(lane.release)
+        else:
+            lane.release()
+    return response
+
+@app.teardown_request
+def release_admission_on_error(exc):
+    """Free the lane slot of a request that failed before producing a response"""
+    lane = g.pop('admission_lane', None)
+    if lane is not None:
+        lane.release()
+
+@app.after_request
+def record_latency(response):
+    """Observe the request in the latency histogram"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=request.endpoint or "unmatched",
+                                method=request.method, status=response.status_code)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress whole JSON bodies for clients that accept gzip or zstd"""
+    if response.direct_passthrough or response.is_streamed or response.mimetype != 'application/json':
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding and should_compress(response.mimetype, response.headers.get('Content-Encoding'),
+                                    response.content_length or 0):
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
 
 # ==================== API ENDPOINTS ====================
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "ok", "message": "EduLedger API is running"})
+    return jsonify({"status": "ok", "message": "EduLedger API is running", "admission": admission.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics"""
+    return Response(REGISTRY.render(), mimetype=METRICS_CONTENT_TYPE)
 
 @app.route('/api/auth/login', methods=['POST'])
 def login():
@@ -39,13 +176,11 @@ def login():
         success, role, name = system.authenticate(username, password)
         
         if success:
-            logged_in_users[username] = {
-                "role": role,
-                "name": name,
-                "username": username
-            }
+            token, expires_at = sessions.create(username, role, name)
             return jsonify({
                 "success": True,
+                "token": token,
+                "expires_at": expires_at,
                 "user": {
                     "username": username,
                     "role": role,
@@ -62,19 +197,71 @@ def login():
 def logout():
     """Logout endpoint"""
     try:
-        data = request.json
-        username = data.get('username')
+        data = request.get_json(silent=True) or {}
+        token = bearer_token(request.headers.get('Authorization')) or data.get('token')
         
-        if username in logged_in_users:
-            del logged_in_users[username]
+        # Only the session's own token can end it
+        if token:
+            sessions.revoke(token)
         
         return jsonify({"success": True, "message": "Logged out successfully"})
     
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/api/auth/session', methods=['GET'])
+def get_session():
+    """Return the user behind the request's bearer token"""
+    try:
+        session = sessions.get(bearer_token(request.headers.get('Authorization')))
+        if not session:
+            return jsonify({"success": False, "message": "Invalid or expired session"}), 401
+        
+        return jsonify({
+            "success": True,
+            "expires_at": session["expires_at"],
+            "user": {
+                "username": session["username"],
+                "role": session["role"],
+                "name": session["name"]
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
 # ==================== ISSUER ENDPOINTS ====================
 
+@app.route('/api/issuer/issuers', methods=['POST'])
+def add_issuer():
+    """Register a new issuing institution"""
+    try:
+        data = request.json
+        username = data.get('username')
+        password = data.get('password')
+        name = data.get('name')
+        
+        if not username or not password or not name:
+            return jsonify({"success": False, "message": "All fields are required"}), 400
+        
+        success, message = system.add_issuer(username, password, name)
+        
+        if success:
+            return jsonify({
+                "success": True,
+                "message": message,
+                "issuer": {
+                    "username": username,
+                    "name": name,
+                    "wallet_address": system.wallets[username].get_address()
+                }
+            })
+        else:
+            return jsonify({"success": False, "message": message}), 400
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/issuer/students', methods=['POST'])
 def add_student():
     """Add a new student"""
@@ -110,9 +297,16 @@ def add_student():
 def get_all_students():
     """Get all students"""
     try:
+        page = page_params(request.args)
+        if page:
+            students, next_cursor = system.get_students_page(*page)
+            return jsonify({"success": True, "students": students, "next_cursor": next_cursor})
+        
         students = system.get_all_students()
         return jsonify({"success": True, "students": students})
     
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
@@ -120,45 +314,16 @@ def get_all_students():
 def issue_certificate():
     """Issue a new certificate"""
     try:
-        data = request.json
-        student_name = data.get('student_name')
-        student_username = data.get('student_username')
-        course = data.get('course')
-        grade = data.get('grade')
+        data, pdf_file = certificate_upload()
+        issuer = resolve_issuer(data.get('issuer'))
         
-        if not student_name or not course or not grade:
-            return jsonify({"success": False, "message": "Student name, course, and grade are required"}), 400
-        
-        if not student_username:
-            return jsonify({"success": False, "message": "Student username is required"}), 400
-        
-        # Check if student exists
-        if student_username not in system.users:
-            return jsonify({"success": False, "message": "Student not found"}), 404
-        
-        # Handle PDF file upload
-        pdf_file = None
-        pdf_data = data.get('pdf_file')
-        if pdf_data:
-            # Decode base64 PDF data
-            try:
-                import base64
-                # Remove data:application/pdf;base64, prefix if present
-                if pdf_data.startswith('data:'):
-                    pdf_data = pdf_data.split(',')[1]
-                pdf_bytes = base64.b64decode(pdf_data)
-                # Create a temporary file object
-                import tempfile
-                pdf_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                pdf_file.write(pdf_bytes)
-                pdf_file.close()
-                pdf_file = pdf_file.name
-            except Exception as e:
-                print(f"Error processing PDF: {e}")
+        invalid = issuance_error(issuer, data)
+        if invalid:
+            return jsonify({"success": False, "message": invalid[0]}), invalid[1]
         
         # Issue certificate (this will create blockchain hash)
         success, cert_id, cert_data = system.issue_certificate(
-            "issuer324", student_name, student_username, course, grade, pdf_file
+            issuer, data['student_name'], data['student_username'], data['course'], data['grade'], pdf_file
         )
         
         if success:
@@ -178,7 +343,8 @@ def issue_certificate():
             
             return jsonify(response_data)
         else:
-            return jsonify({"success": False, "message": "Error issuing certificate"}), 500
+            # The certificate ID slot carries the reason, e.g. an incomplete PDF upload
+            return jsonify({"success": False, "message": cert_id}), 400
     
     except Exception as e:
         import traceback
@@ -186,21 +352,245 @@ def issue_certificate():
         print(f"Error issuing certificate: {error_details}")
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/api/issuer/certificates/jobs', methods=['POST'])
+def submit_issuance_job():
+    """Queue a certificate for issuance and return its job ID at once (202)"""
+    try:
+        data, pdf_file = certificate_upload()
+        issuer = resolve_issuer(data.get('issuer'))
+        
+        invalid = issuance_error(issuer, data)
+        if invalid:
+            return jsonify({"success": False, "message": invalid[0]}), invalid[1]
+        
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        try:
+            job, created = system.issuance_jobs.submit(issuer, data, pdf_file, idempotency_key)
+        except IdempotencyConflict as e:
+            return jsonify({"success": False, "message": str(e)}), 409
+        except QueueFull as e:
+            response = jsonify({"success": False, "message": str(e)})
+            response.status_code = 503
+            response.headers['Retry-After'] = '5'
+            return response
+        
+        response = jsonify({"success": True, "job": job.to_dict()})
+        response.status_code = 202 if created or job.status == PENDING else 200
+        response.headers['Location'] = f"/api/issuer/certificates/jobs/{job.job_id}"
+        if not created:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/issuer/certificates/jobs/<job_id>', methods=['GET'])
+def get_issuance_job(job_id):
+    """Report an issuance job as pending, mined (with its block hash) or failed"""
+    try:
+        job = system.issuance_jobs.get(job_id)
+        if not job:
+            return jsonify({"success": False, "message": "Job not found"}), 404
+        
+        response = jsonify({"success": True, "job": job.to_dict()})
+        response.headers['Cache-Control'] = 'no-store'
+        if job.status == PENDING:
+            response.headers['Retry-After'] = '1'
+        return response
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/issuer/certificates/bulk', methods=['POST'])
+def issue_certificates_bulk():
+    """Issue certificates from a CSV or JSONL upload, streaming per-row results"""
+    try:
+        # Accept either a multipart file field or the raw request body. Only multipart is
+        # parsed as a form: for any other type the body is the upload itself, even when a
+        # client (curl --data-binary) labels it application/x-www-form-urlencoded
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if not upload:
+                return jsonify({"success": False, "message": "Multipart upload must include a file field"}), 400
+            source = upload.stream
+            filename = upload.filename or ''
+            content_type = upload.mimetype or ''
+        else:
+            source = request.stream
+            filename = ''
+            content_type = request.mimetype or ''
+        
+        fmt = request.args.get('format')
+        if not fmt:
+            is_csv = filename.lower().endswith('.csv') or content_type in ('text/csv', 'application/csv')
+            fmt = 'csv' if is_csv else 'jsonl'
+        if fmt not in ('csv', 'jsonl'):
+            return jsonify({"success": False, "message": "Format must be csv or jsonl"}), 400
+        
+        chunk_size = bulk_chunk_size(request.args)
+        issuer = resolve_issuer(request.args.get('issuer'))
+        if not issuer:
+            return jsonify({"success": False, "message": "Invalid issuer"}), 400
+        
+        # Spool the upload (memory up to 8 MiB, disk beyond) before the streaming response
+        # starts, since the request and its files are closed by then
+        body = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_SIZE)
+        shutil.copyfileobj(source, body)
+        if not body.tell():
+            body.close()
+            return jsonify({"success": False, "message": "Upload is empty"}), 400
+        body.seek(0)
+        
+        results = system.issue_certificates_bulk(issuer, iter_bulk_rows(body, fmt), chunk_size=chunk_size)
+        
+        def generate():
+            issued = failed = 0
+            try:
+                for result in results:
+                    if result["success"]:
+                        issued += 1
+                    else:
+                        failed += 1
+                    yield dumps(result) + b"\n"
+                yield dumps({"done": True, "issued": issued, "failed": failed}) + b"\n"
+            finally:
+                body.close()
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/issuer/certificates/revoke', methods=['POST'])
+def revoke_certificate():
+    """Revoke an issued certificate"""
+    try:
+        data = request.json
+        cert_id = data.get('certificate_id')
+        reason = data.get('reason', '')
+        issuer = resolve_issuer(data.get('issuer'))
+        
+        if not cert_id:
+            return jsonify({"success": False, "message": "Certificate ID required"}), 400
+        
+        if not issuer:
+            return jsonify({"success": False, "message": "Invalid issuer"}), 400
+        
+        if cert_id not in system.certificates:
+            return jsonify({"success": False, "message": "Certificate not found"}), 404
+        
+        success, message = system.revoke_certificate(issuer, cert_id, reason)
+        
+        if success:
+            return jsonify({"success": True, "message": message})
+        else:
+            return jsonify({"success": False, "message": message}), 400
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/certificates/search', methods=['GET'])
+def search_certificates():
+    """Search active certificates by course, grade, issuer and issue date range"""
+    try:
+        course = request.args.get('course')
+        grade = request.args.get('grade')
+        issuer = request.args.get('issuer')
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        year = request.args.get('year')
+        
+        if year:
+            date_from = date_from or f"{year}-01-01"
+            date_to = date_to or f"{year}-12-31"
+        
+        if not any([course, grade, issuer, date_from, date_to]):
+            return jsonify({"success": False, "message": "At least one search filter required"}), 400
+        
+        certs = system.search_certificates(course, grade, issuer, date_from, date_to)
+        
+        return jsonify({
+            "success": True,
+            "total": len(certs),
+            "certificates": [Fragment(cert.canonical_json()) for cert in certs]
+        })
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/revocations', methods=['GET'])
+def get_revocations():
+    """Get revocations recorded after a chain height, for offline verifiers"""
+    try:
+        # Without since_height every revocation is listed
+        since_height = int_param(request.args, 'since_height')
+        return jsonify({"success": True, **system.revocation_delta(-1 if since_height is None else since_height)})
+    
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/issuer/wallet', methods=['GET'])
 def get_issuer_wallet():
     """Get issuer wallet information"""
     try:
-        wallet = system.wallets["issuer324"]
-        stats = system.issuer_stats.get("issuer324", {"total_issued": 0, "by_student": {}})
+        issuer = resolve_issuer(request.args.get('issuer'))
+        if not issuer:
+            return jsonify({"success": False, "message": "Invalid issuer"}), 400
         
-        return jsonify({
+        # Tag before reading, so a concurrent change can only make the body newer than its tag
+        etag = system.view_tag(issuer=issuer)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        wallet = system.wallets[issuer]
+        stats = system.issuer_stats.get(issuer, {"total_issued": 0, "by_student": {}})
+        
+        return tagged(jsonify({
             "success": True,
             "wallet": {
-                "owner": "Institute XYZ",
+                "owner": system.users[issuer]["name"],
                 "address": wallet.get_address(),
                 "total_issued": stats["total_issued"],
-                "by_student": stats["by_student"]
+                "by_student": dict(stats["by_student"]),
+                "by_student_username": {
+                    username: count
+                    for (cert_issuer, username), count in system.analytics.breakdown("issuer_student").items()
+                    if cert_issuer == issuer
+                }
             }
+        }), etag)
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/issuer/analytics', methods=['GET'])
+def get_issuance_analytics():
+    """Get issuance counters broken down by issuer, course, grade, month or student"""
+    try:
+        from analytics import DIMENSIONS
+        
+        dimension = request.args.get('dimension', 'course')
+        if dimension not in DIMENSIONS:
+            return jsonify({
+                "success": False,
+                "message": f"Dimension must be one of: {', '.join(DIMENSIONS)}"
+            }), 400
+        
+        include_revoked = request.args.get('include_revoked') == 'true'
+        counts = system.analytics.breakdown(dimension, include_revoked)
+        # Compound keys such as (course, month) are flattened to "course/month"
+        counts = {"/".join(k) if isinstance(k, tuple) else k: v for k, v in counts.items()}
+        
+        return jsonify({
+            "success": True,
+            "summary": system.analytics.summary(),
+            "dimension": dimension,
+            "counts": counts
         })
     
     except Exception as e:
@@ -208,32 +598,39 @@ def get_issuer_wallet():
 
 @app.route('/api/issuer/blockchain', methods=['GET'])
 def get_blockchain():
-    """Get blockchain information"""
+    """Get a range of blocks (latest EXPLORER_PAGE_SIZE by default) and chain status"""
     try:
-        from datetime import datetime
-        
-        blockchain_data = []
-        for block in system.blockchain.chain:
-            blockchain_data.append({
-                "index": block.index,
-                "timestamp": datetime.fromtimestamp(block.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
-                "hash": block.hash,
-                "previous_hash": block.previous_hash,
-                "nonce": block.nonce,
-                "data_type": block.data.get('type', 'unknown'),
-                "data": block.data
-            })
-        
-        return jsonify({
+        # ?partition=<issuer> selects that issuer's partition chain when partitioning is enabled
+        partition = request.args.get('partition')
+        if partition and partition not in system.partitions:
+            return jsonify({"success": False, "message": "Partition not found"}), 404
+        ledger = system.partitions[partition] if partition else system.blockchain
+        
+        start, end, limit, fields = explorer_params(request.args)
+        etag = f"{ledger.get_latest_block().hash[:16]}-{len(system.partitions)}"
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        blocks = ledger.get_blocks(start, end, limit)
+        
+        return tagged(jsonify({
             "success": True,
             "blockchain": {
-                "total_blocks": len(system.blockchain.chain),
-                "difficulty": system.blockchain.difficulty,
-                "valid": system.blockchain.is_chain_valid(),
-                "blocks": blockchain_data
+                "partition": partition,
+                "partitions": list(system.partitions),
+                "total_blocks": len(ledger.chain),
+                "difficulty": ledger.difficulty,
+                "valid": ledger.is_chain_valid_cached(),
+                "from": blocks[0].index if blocks else None,
+                "to": blocks[-1].index if blocks else None,
+                # Upper bound of the next older page, for ?to=
+                "older": blocks[0].index - 1 if blocks and blocks[0].index > 0 else None,
+                "blocks": [block_view(block, fields) for block in blocks]
             }
-        })
+        }), etag)
     
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
@@ -248,14 +645,29 @@ def get_student_certificates():
         if not username:
             return jsonify({"success": False, "message": "Username required"}), 400
         
-        certs = system.get_student_certificates(username)
+        etag = system.view_tag(student=username)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        page = page_params(request.args)
+        next_cursor = None
+        if page:
+            certs, next_cursor = system.get_student_certificates_page(username, *page)
+        else:
+            certs = system.get_student_certificates(username)
         certificates = []
         
         for cert in certs:
-            certificates.append(cert.to_dict())
+            certificates.append(json_fragment(cert.canonical_json(), revoked=system.is_revoked(cert.cert_id)))
         
-        return jsonify({"success": True, "certificates": certificates})
+        response_data = {"success": True, "certificates": certificates}
+        if page:
+            response_data["next_cursor"] = next_cursor
+        return tagged(jsonify(response_data), etag)
     
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
@@ -275,7 +687,7 @@ def verify_certificate():
         if valid:
             cert = system.get_certificate(cert_id)
             if cert:
-                cert_details = cert.to_dict()
+                cert_details = Fragment(cert.canonical_json())
         
         return jsonify({
             "success": True,
@@ -287,6 +699,84 @@ def verify_certificate():
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/api/student/verify/batch', methods=['POST'])
+def verify_certificates_batch():
+    """Verify a list of certificates, streaming NDJSON verdicts for large batches"""
+    try:
+        data = request.get_json(silent=True) or {}
+        cert_ids = data.get('certificate_ids')
+        
+        if not isinstance(cert_ids, list) or not all(isinstance(cert_id, str) for cert_id in cert_ids):
+            return jsonify({"success": False, "message": "certificate_ids must be a list of certificate IDs"}), 400
+        
+        if len(cert_ids) > MAX_VERIFY_BATCH:
+            return jsonify({"success": False, "message": f"At most {MAX_VERIFY_BATCH} certificates per batch"}), 400
+        
+        def verdicts():
+            for cert_id, valid, message in system.verify_many(cert_ids):
+                result = {"certificate_id": cert_id, "valid": valid, "message": message}
+                if valid:
+                    result["certificate"] = Fragment(system.get_certificate(cert_id).canonical_json())
+                yield result
+        
+        if request.args.get('stream') == '1' or len(cert_ids) > VERIFY_STREAM_THRESHOLD:
+            def generate():
+                verified = invalid = 0
+                for result in verdicts():
+                    if result["valid"]:
+                        verified += 1
+                    else:
+                        invalid += 1
+                    yield dumps(result) + b"\n"
+                yield dumps({"done": True, "verified": verified, "invalid": invalid}) + b"\n"
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        results = list(verdicts())
+        verified = sum(1 for result in results if result["valid"])
+        return jsonify({
+            "success": True,
+            "results": results,
+            "verified": verified,
+            "invalid": len(results) - verified
+        })
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Server-sent events for new blocks, issuance, revocations and consent changes"""
+    try:
+        subscription = event_subscription(request.headers.get('Last-Event-ID'), request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    def generate():
+        yield PREAMBLE
+        for event in subscription.backlog:
+            yield format_event(event)
+        while True:
+            events = subscription.take()
+            for event in events:
+                yield format_event(event)
+            if not events and not subscription.wait(KEEPALIVE_INTERVAL):
+                yield KEEPALIVE
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/verification-cache', methods=['GET'])
+def get_verification_cache_stats():
+    """Get verification cache hit/miss counters"""
+    try:
+        return jsonify({"success": True, "cache": system.verification_cache.stats()})
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/student/consents/grant', methods=['POST'])
 def grant_consent():
     """Grant consent to HR"""
@@ -346,10 +836,22 @@ def get_consents():
         if not username:
             return jsonify({"success": False, "message": "Username required"}), 400
         
+        etag = system.view_tag(student=username)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        page = page_params(request.args)
+        if page:
+            consents, next_cursor = system.consent_manager.get_student_consents_page(username, *page)
+            return tagged(jsonify({"success": True, "consents": consents, "next_cursor": next_cursor}), etag)
+        
         consents = system.consent_manager.get_student_consents(username)
         
-        return jsonify({"success": True, "consents": consents})
+        return tagged(jsonify({"success": True, "consents": consents}), etag)
     
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
@@ -368,17 +870,22 @@ def download_certificate_pdf():
         if not pdf_path:
             return jsonify({"success": False, "message": "PDF not found for this certificate"}), 404
         
-        # Check if file exists
-        if not os.path.exists(pdf_path):
-            return jsonify({"success": False, "message": "PDF file does not exist"}), 404
-        
-        # Send file
-        return send_file(
+        # Send file through the server's file wrapper (sendfile where available), with
+        # Range and If-None-Match support. The ipfs_hash is the content hash, so it
+        # makes a strong ETag and the response is immutable.
+        response = send_file(
             pdf_path,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=f'{cert_id}.pdf'
+            download_name=f'{cert_id}.pdf',
+            conditional=True,
+            etag=system.get_certificate(cert_id).ipfs_hash,
+            max_age=PDF_MAX_AGE
         )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.immutable = True
+        return response
     
     except Exception as e:
         import traceback
@@ -406,11 +913,12 @@ def view_certificate_hr():
         
         cert_details = None
         if has_consent:
-            cert_details = cert.to_dict()
+            cert_details = Fragment(cert.canonical_json())
         
         return jsonify({
             "success": True,
             "has_consent": has_consent,
+            "revoked": system.is_revoked(cert_id),
             "certificate": cert_details
         })
     
@@ -421,13 +929,18 @@ def view_certificate_hr():
 def get_accessible_certificates():
     """Get accessible certificates"""
     try:
+        etag = system.view_tag(hr="HR023")
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         accessible = []
-        for cert_id, cert in system.certificates.items():
+        for cert_id, cert in list(system.certificates.items()):
             student_username = cert.student_username
             if system.consent_manager.check_consent(student_username, "HR023", cert_id):
-                accessible.append(cert.to_dict())
+                accessible.append(json_fragment(cert.canonical_json(), revoked=system.is_revoked(cert_id)))
         
-        return jsonify({"success": True, "certificates": accessible})
+        return tagged(jsonify({"success": True, "certificates": accessible}), etag)
     
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
@@ -437,5 +950,5 @@ def get_accessible_certificates():
 if __name__ == '__main__':
     print("Starting EduLedger API Server on http://localhost:5000")
     print("API endpoints available at http://localhost:5000/api")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
 
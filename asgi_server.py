@@ -0,0 +1,1045 @@
+"""
+ASGI API Server for EduLedger Certificate Management System
+Serves the same /api routes as api_server.py on asyncio. CPU-heavy ledger work
+(mining, signing, key generation, chain validation) runs in thread pools so reads
+keep being served while an issuance is in flight.
+
+Run with: uvicorn asgi_server:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Import the certificate system
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from certificate_system import system, iter_bulk_rows, block_view
+from analytics import DIMENSIONS
+from response_encoding import (Fragment, json_fragment, dumps, compress, negotiate_encoding,
+                               should_compress)
+from session_store import SessionStore
+from metrics import REGISTRY, REQUEST_SECONDS, CONTENT_TYPE as METRICS_CONTENT_TYPE, Gauge
+from event_stream import KEEPALIVE, KEEPALIVE_INTERVAL, PREAMBLE, format_event
+from issuance_jobs import IdempotencyConflict, QueueFull, PENDING
+from api_common import (PDF_MAX_AGE, VERIFY_STREAM_THRESHOLD, MAX_VERIFY_BATCH, BULK_SPOOL_SIZE,
+                        resolve_issuer, issuance_error, bearer_token, int_param, page_params,
+                        explorer_params, bulk_chunk_size, etag_matches, tagged, event_subscription,
+                        decode_pdf_field)
+
+# Writes (mining, signing, key generation) and CPU-heavy reads get separate pools,
+# so verification never queues behind a long issuance
+write_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ledger-write")
+read_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ledger-read")
+
+Gauge("eduledger_executor_queued", "Tasks waiting for a worker thread, per pool", ("pool",),
+      function=lambda: {("write",): write_executor._work_queue.qsize(), ("read",): read_executor._work_queue.qsize()})
+
+# Logged-in sessions, shared with every other worker process on this host
+sessions = SessionStore()
+
+routes = []
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through response_encoding, so cached certificate JSON is spliced in as-is"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+class TimingMiddleware:
+    """Observe each request in the latency histogram when its response starts"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                # The router has filled in the endpoint by now
+                endpoint = scope.get("endpoint")
+                REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                        endpoint=getattr(endpoint, "__name__", "unmatched"),
+                                        method=scope["method"], status=message["status"])
+            await send(message)
+
+        await self.app(scope, receive, send_timed)
+
+class CompressionMiddleware:
+    """Compress whole JSON bodies for clients that accept gzip or zstd; streams and files pass through"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether the response is worth compressing
+                start = message
+                return
+            if start is not None:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    headers = MutableHeaders(raw=start["headers"])
+                    body = message.get("body", b"")
+                    if headers.get("content-type", "").startswith("application/json"):
+                        headers.add_vary_header("Accept-Encoding")
+                        if encoding and should_compress(headers.get("content-type"),
+                                                        headers.get("content-encoding"), len(body)):
+                            body = compress(body, encoding)
+                            headers["Content-Encoding"] = encoding
+                            headers["Content-Length"] = str(len(body))
+                            message = {**message, "body": body}
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+def route(path, methods):
+    """Register an endpoint, Flask style"""
+    def decorator(endpoint):
+        routes.append(Route(path, endpoint, methods=methods))
+        return endpoint
+    return decorator
+
+async def run_write(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(write_executor, partial(fn, *args, **kwargs))
+
+async def run_read(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(read_executor, partial(fn, *args, **kwargs))
+
+async def json_body(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+class RequestBodyReader(io.RawIOBase):
+    """Blocking file-like view of a request body, read from a worker thread"""
+
+    def __init__(self, request, loop):
+        self._chunks = request.stream()
+        self._loop = loop
+        self._buffer = b""
+        self._eof = False
+
+    async def _next_chunk(self):
+        return await self._chunks.__anext__()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        # Pull the next chunk off the event loop only when the previous one is used up
+        while not self._buffer and not self._eof:
+            try:
+                self._buffer = asyncio.run_coroutine_threadsafe(self._next_chunk(), self._loop).result()
+            except StopAsyncIteration:
+                self._eof = True
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+def not_modified(request, etag):
+    """Return a 304 response when If-None-Match already names this version, else None"""
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return tagged(Response(status_code=304), etag)
+    return None
+
+async def certificate_upload(request):
+    """Return (fields, PDF stream or None) from a multipart, raw application/pdf or JSON request"""
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    if content_type in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        form = await request.form()
+        upload = form.get('pdf_file')
+        return form, (upload.file if getattr(upload, 'filename', None) else None)
+
+    if content_type == 'application/pdf':
+        # The body is the PDF itself and is pulled off the socket during ingest;
+        # the certificate fields travel in the query string
+        if request.headers.get('content-length') == '0':
+            return request.query_params, None
+        return request.query_params, RequestBodyReader(request, asyncio.get_running_loop())
+
+    # Legacy JSON body with the PDF base64-encoded in pdf_file
+    data = await json_body(request)
+    return data, decode_pdf_field(data)
+
+def error(message, status_code):
+    return FastJSONResponse({"success": False, "message": message}, status_code=status_code)
+
+# ==================== API ENDPOINTS ====================
+
+@route('/api/health', methods=['GET'])
+async def health_check(request):
+    """Health check endpoint"""
+    return FastJSONResponse({"status": "ok", "message": "EduLedger API is running"})
+
+@route('/metrics', methods=['GET'])
+async def get_metrics(request):
+    """Prometheus metrics"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+@route('/api/auth/login', methods=['POST'])
+async def login(request):
+    """Login endpoint"""
+    try:
+        data = await json_body(request)
+        username = data.get('username')
+        password = data.get('password')
+
+        if not username or not password:
+            return error("Username and password required", 400)
+
+        success, role, name = system.authenticate(username, password)
+
+        if success:
+            # SQLite I/O stays off the event loop
+            token, expires_at = await run_read(sessions.create, username, role, name)
+            return FastJSONResponse({
+                "success": True,
+                "token": token,
+                "expires_at": expires_at,
+                "user": {
+                    "username": username,
+                    "role": role,
+                    "name": name
+                }
+            })
+        else:
+            return error("Invalid credentials", 401)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/auth/logout', methods=['POST'])
+async def logout(request):
+    """Logout endpoint"""
+    try:
+        data = await json_body(request)
+        token = bearer_token(request.headers.get('authorization')) or data.get('token')
+
+        # Only the session's own token can end it
+        if token:
+            await run_read(sessions.revoke, token)
+
+        return FastJSONResponse({"success": True, "message": "Logged out successfully"})
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/auth/session', methods=['GET'])
+async def get_session(request):
+    """Return the user behind the request's bearer token"""
+    try:
+        session = await run_read(sessions.get, bearer_token(request.headers.get('authorization')))
+        if not session:
+            return error("Invalid or expired session", 401)
+
+        return FastJSONResponse({
+            "success": True,
+            "expires_at": session["expires_at"],
+            "user": {
+                "username": session["username"],
+                "role": session["role"],
+                "name": session["name"]
+            }
+        })
+
+    except Exception as e:
+        return error(str(e), 500)
+
+# ==================== ISSUER ENDPOINTS ====================
+
+@route('/api/issuer/issuers', methods=['POST'])
+async def add_issuer(request):
+    """Register a new issuing institution"""
+    try:
+        data = await json_body(request)
+        username = data.get('username')
+        password = data.get('password')
+        name = data.get('name')
+
+        if not username or not password or not name:
+            return error("All fields are required", 400)
+
+        success, message = await run_write(system.add_issuer, username, password, name)
+
+        if success:
+            return FastJSONResponse({
+                "success": True,
+                "message": message,
+                "issuer": {
+                    "username": username,
+                    "name": name,
+                    "wallet_address": system.wallets[username].get_address()
+                }
+            })
+        else:
+            return error(message, 400)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/students', methods=['POST'])
+async def add_student(request):
+    """Add a new student"""
+    try:
+        data = await json_body(request)
+        username = data.get('username')
+        password = data.get('password')
+        full_name = data.get('full_name')
+
+        if not username or not password or not full_name:
+            return error("All fields are required", 400)
+
+        success, message = await run_write(system.add_student, username, password, full_name)
+
+        if success:
+            return FastJSONResponse({
+                "success": True,
+                "message": message,
+                "student": {
+                    "username": username,
+                    "name": full_name,
+                    "wallet_address": system.wallets[username].get_address()
+                }
+            })
+        else:
+            return error(message, 400)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/students', methods=['GET'])
+async def get_all_students(request):
+    """Get all students"""
+    try:
+        page = page_params(request.query_params)
+        if page:
+            students, next_cursor = system.get_students_page(*page)
+            return FastJSONResponse({"success": True, "students": students, "next_cursor": next_cursor})
+
+        students = system.get_all_students()
+        return FastJSONResponse({"success": True, "students": students})
+
+    except ValueError as e:
+        return error(str(e), 400)
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/certificates', methods=['POST'])
+async def issue_certificate(request):
+    """Issue a new certificate"""
+    try:
+        data, pdf_file = await certificate_upload(request)
+        issuer = resolve_issuer(data.get('issuer'))
+
+        invalid = issuance_error(issuer, data)
+        if invalid:
+            return error(*invalid)
+
+        # Issue certificate off the event loop (signing and mining are CPU-bound)
+        success, cert_id, cert_data = await run_write(
+            system.issue_certificate, issuer, data['student_name'], data['student_username'],
+            data['course'], data['grade'], pdf_file
+        )
+
+        if success:
+            cert = system.get_certificate(cert_id)
+
+            response_data = {
+                "success": True,
+                "certificate_id": cert_id,
+                "certificate": cert_data
+            }
+
+            if cert and cert.blockchain_hash:
+                response_data["blockchain_hash"] = cert.blockchain_hash
+                response_data["certificate"]["blockchain_hash"] = cert.blockchain_hash
+
+            return FastJSONResponse(response_data)
+        else:
+            # The certificate ID slot carries the reason, e.g. an incomplete PDF upload
+            return error(cert_id, 400)
+
+    except Exception as e:
+        import traceback
+        print(f"Error issuing certificate: {traceback.format_exc()}")
+        return error(str(e), 500)
+    finally:
+        # Drops any spooled multipart upload
+        await request.close()
+
+@route('/api/issuer/certificates/jobs', methods=['POST'])
+async def submit_issuance_job(request):
+    """Queue a certificate for issuance and return its job ID at once (202)"""
+    try:
+        data, pdf_file = await certificate_upload(request)
+        issuer = resolve_issuer(data.get('issuer'))
+
+        invalid = issuance_error(issuer, data)
+        if invalid:
+            return error(*invalid)
+
+        idempotency_key = request.headers.get('idempotency-key') or data.get('idempotency_key')
+        try:
+            # Copies the PDF off the request, so it runs in the read pool
+            job, created = await run_read(system.issuance_jobs.submit, issuer, data, pdf_file, idempotency_key)
+        except IdempotencyConflict as e:
+            return error(str(e), 409)
+        except QueueFull as e:
+            response = error(str(e), 503)
+            response.headers['Retry-After'] = '5'
+            return response
+
+        response = FastJSONResponse({"success": True, "job": job.to_dict()},
+                                    status_code=202 if created or job.status == PENDING else 200)
+        response.headers['Location'] = f"/api/issuer/certificates/jobs/{job.job_id}"
+        if not created:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    except Exception as e:
+        return error(str(e), 500)
+    finally:
+        # Drops any spooled multipart upload
+        await request.close()
+
+@route('/api/issuer/certificates/jobs/{job_id}', methods=['GET'])
+async def get_issuance_job(request):
+    """Report an issuance job as pending, mined (with its block hash) or failed"""
+    try:
+        job = system.issuance_jobs.get(request.path_params['job_id'])
+        if not job:
+            return error("Job not found", 404)
+
+        response = FastJSONResponse({"success": True, "job": job.to_dict()})
+        response.headers['Cache-Control'] = 'no-store'
+        if job.status == PENDING:
+            response.headers['Retry-After'] = '1'
+        return response
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/certificates/bulk', methods=['POST'])
+async def issue_certificates_bulk(request):
+    """Issue certificates from a raw CSV or JSONL body, streaming per-row results"""
+    try:
+        content_type = request.headers.get('content-type', '').split(';')[0].strip()
+        if content_type == 'multipart/form-data':
+            return error("Send the CSV or JSONL as the request body, not as a multipart form", 400)
+        fmt = request.query_params.get('format')
+        if not fmt:
+            fmt = 'csv' if content_type in ('text/csv', 'application/csv') else 'jsonl'
+        if fmt not in ('csv', 'jsonl'):
+            return error("Format must be csv or jsonl", 400)
+
+        issuer = resolve_issuer(request.query_params.get('issuer'))
+        if not issuer:
+            return error("Invalid issuer", 400)
+
+        chunk_size = bulk_chunk_size(request.query_params)
+
+        # Spool the upload (memory up to 8 MiB, disk beyond) before the streaming response
+        # starts, since the response then owns the receive channel
+        body = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_SIZE)
+        async for chunk in request.stream():
+            body.write(chunk)
+        if not body.tell():
+            body.close()
+            return error("Upload is empty", 400)
+        body.seek(0)
+
+        loop = asyncio.get_running_loop()
+        results = asyncio.Queue(maxsize=chunk_size)
+        done = object()
+        # Set when the response ends early (client disconnect), so the worker stops
+        # instead of blocking forever on a full queue
+        cancelled = threading.Event()
+
+        def hand_off(item):
+            """Queue an item for the event loop; False once the stream has been abandoned"""
+            try:
+                future = asyncio.run_coroutine_threadsafe(results.put(item), loop)
+            except RuntimeError:
+                return False  # Event loop already closed
+            while True:
+                try:
+                    future.result(timeout=1.0)
+                    return True
+                except FutureTimeoutError:
+                    if cancelled.is_set():
+                        future.cancel()
+                        return False
+
+        def work():
+            # Runs in the write pool, issuing chunk by chunk and handing each
+            # result back to the event loop as it is produced
+            issued = None
+            try:
+                issued = system.issue_certificates_bulk(issuer, iter_bulk_rows(body, fmt), chunk_size=chunk_size)
+                for result in issued:
+                    if not hand_off(result):
+                        break
+            except Exception as e:
+                hand_off({"success": False, "message": str(e)})
+            finally:
+                if issued is not None:
+                    issued.close()
+                body.close()
+                hand_off(done)
+
+        async def generate():
+            issued = failed = 0
+            worker = loop.run_in_executor(write_executor, work)
+            try:
+                while True:
+                    result = await results.get()
+                    if result is done:
+                        break
+                    if result["success"]:
+                        issued += 1
+                    else:
+                        failed += 1
+                    yield dumps(result) + b"\n"
+                await worker
+                yield dumps({"done": True, "issued": issued, "failed": failed}) + b"\n"
+            finally:
+                cancelled.set()
+
+        return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+    except ValueError as e:
+        return error(str(e), 400)
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/certificates/revoke', methods=['POST'])
+async def revoke_certificate(request):
+    """Revoke an issued certificate"""
+    try:
+        data = await json_body(request)
+        cert_id = data.get('certificate_id')
+        reason = data.get('reason', '')
+        issuer = resolve_issuer(data.get('issuer'))
+
+        if not cert_id:
+            return error("Certificate ID required", 400)
+
+        if not issuer:
+            return error("Invalid issuer", 400)
+
+        if cert_id not in system.certificates:
+            return error("Certificate not found", 404)
+
+        success, message = await run_write(system.revoke_certificate, issuer, cert_id, reason)
+
+        if success:
+            return FastJSONResponse({"success": True, "message": message})
+        else:
+            return error(message, 400)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/certificates/search', methods=['GET'])
+async def search_certificates(request):
+    """Search active certificates by course, grade, issuer and issue date range"""
+    try:
+        args = request.query_params
+        course = args.get('course')
+        grade = args.get('grade')
+        issuer = args.get('issuer')
+        date_from = args.get('from')
+        date_to = args.get('to')
+        year = args.get('year')
+
+        if year:
+            date_from = date_from or f"{year}-01-01"
+            date_to = date_to or f"{year}-12-31"
+
+        if not any([course, grade, issuer, date_from, date_to]):
+            return error("At least one search filter required", 400)
+
+        certs = system.search_certificates(course, grade, issuer, date_from, date_to)
+
+        return FastJSONResponse({
+            "success": True,
+            "total": len(certs),
+            "certificates": [Fragment(cert.canonical_json()) for cert in certs]
+        })
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/revocations', methods=['GET'])
+async def get_revocations(request):
+    """Get revocations recorded after a chain height, for offline verifiers"""
+    try:
+        # Without since_height every revocation is listed
+        since_height = int_param(request.query_params, 'since_height')
+        return FastJSONResponse({"success": True, **system.revocation_delta(-1 if since_height is None else since_height)})
+
+    except ValueError as e:
+        return error(str(e), 400)
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/wallet', methods=['GET'])
+async def get_issuer_wallet(request):
+    """Get issuer wallet information"""
+    try:
+        issuer = resolve_issuer(request.query_params.get('issuer'))
+        if not issuer:
+            return error("Invalid issuer", 400)
+
+        # Tag before reading, so a concurrent change can only make the body newer than its tag
+        etag = system.view_tag(issuer=issuer)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        wallet = system.wallets[issuer]
+        stats = system.issuer_stats.get(issuer, {"total_issued": 0, "by_student": {}})
+
+        return tagged(FastJSONResponse({
+            "success": True,
+            "wallet": {
+                "owner": system.users[issuer]["name"],
+                "address": wallet.get_address(),
+                "total_issued": stats["total_issued"],
+                "by_student": dict(stats["by_student"]),
+                "by_student_username": {
+                    username: count
+                    for (cert_issuer, username), count in system.analytics.breakdown("issuer_student").items()
+                    if cert_issuer == issuer
+                }
+            }
+        }), etag)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/analytics', methods=['GET'])
+async def get_issuance_analytics(request):
+    """Get issuance counters broken down by issuer, course, grade, month or student"""
+    try:
+        dimension = request.query_params.get('dimension', 'course')
+        if dimension not in DIMENSIONS:
+            return error(f"Dimension must be one of: {', '.join(DIMENSIONS)}", 400)
+
+        include_revoked = request.query_params.get('include_revoked') == 'true'
+        counts = system.analytics.breakdown(dimension, include_revoked)
+        # Compound keys such as (course, month) are flattened to "course/month"
+        counts = {"/".join(k) if isinstance(k, tuple) else k: v for k, v in counts.items()}
+
+        return FastJSONResponse({
+            "success": True,
+            "summary": system.analytics.summary(),
+            "dimension": dimension,
+            "counts": counts
+        })
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/issuer/blockchain', methods=['GET'])
+async def get_blockchain(request):
+    """Get a range of blocks (latest EXPLORER_PAGE_SIZE by default) and chain status"""
+    try:
+        # ?partition=<issuer> selects that issuer's partition chain when partitioning is enabled
+        partition = request.query_params.get('partition')
+        if partition and partition not in system.partitions:
+            return error("Partition not found", 404)
+        ledger = system.partitions[partition] if partition else system.blockchain
+
+        start, end, limit, fields = explorer_params(request.query_params)
+        etag = f"{ledger.get_latest_block().hash[:16]}-{len(system.partitions)}"
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        blocks = ledger.get_blocks(start, end, limit)
+
+        return tagged(FastJSONResponse({
+            "success": True,
+            "blockchain": {
+                "partition": partition,
+                "partitions": list(system.partitions),
+                "total_blocks": len(ledger.chain),
+                "difficulty": ledger.difficulty,
+                "valid": await run_read(ledger.is_chain_valid_cached),
+                "from": blocks[0].index if blocks else None,
+                "to": blocks[-1].index if blocks else None,
+                # Upper bound of the next older page, for ?to=
+                "older": blocks[0].index - 1 if blocks and blocks[0].index > 0 else None,
+                "blocks": [block_view(block, fields) for block in blocks]
+            }
+        }), etag)
+
+    except ValueError as e:
+        return error(str(e), 400)
+    except Exception as e:
+        return error(str(e), 500)
+
+# ==================== STUDENT ENDPOINTS ====================
+
+@route('/api/student/certificates', methods=['GET'])
+async def get_student_certificates(request):
+    """Get student certificates"""
+    try:
+        username = request.query_params.get('username')
+
+        if not username:
+            return error("Username required", 400)
+
+        etag = system.view_tag(student=username)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        page = page_params(request.query_params)
+        next_cursor = None
+        if page:
+            certs, next_cursor = system.get_student_certificates_page(username, *page)
+        else:
+            certs = system.get_student_certificates(username)
+
+        certificates = [json_fragment(cert.canonical_json(), revoked=system.is_revoked(cert.cert_id))
+                        for cert in certs]
+
+        response_data = {"success": True, "certificates": certificates}
+        if page:
+            response_data["next_cursor"] = next_cursor
+        return tagged(FastJSONResponse(response_data), etag)
+
+    except ValueError as e:
+        return error(str(e), 400)
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/student/verify', methods=['POST'])
+async def verify_certificate(request):
+    """Verify a certificate"""
+    try:
+        data = await json_body(request)
+        cert_id = data.get('certificate_id')
+
+        if not cert_id:
+            return error("Certificate ID required", 400)
+
+        # Cache misses re-validate the chain, so keep them off the event loop
+        valid, message = await run_read(system.verify_certificate, cert_id)
+
+        cert_details = {}
+        if valid:
+            cert = system.get_certificate(cert_id)
+            if cert:
+                cert_details = Fragment(cert.canonical_json())
+
+        return FastJSONResponse({
+            "success": True,
+            "valid": valid,
+            "message": message,
+            "certificate": cert_details if valid else None
+        })
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/student/verify/batch', methods=['POST'])
+async def verify_certificates_batch(request):
+    """Verify a list of certificates, streaming NDJSON verdicts for large batches"""
+    try:
+        data = await json_body(request)
+        cert_ids = data.get('certificate_ids')
+
+        if not isinstance(cert_ids, list) or not all(isinstance(cert_id, str) for cert_id in cert_ids):
+            return error("certificate_ids must be a list of certificate IDs", 400)
+
+        if len(cert_ids) > MAX_VERIFY_BATCH:
+            return error(f"At most {MAX_VERIFY_BATCH} certificates per batch", 400)
+
+        def verdicts():
+            for cert_id, valid, message in system.verify_many(cert_ids):
+                result = {"certificate_id": cert_id, "valid": valid, "message": message}
+                if valid:
+                    result["certificate"] = Fragment(system.get_certificate(cert_id).canonical_json())
+                yield result
+
+        if request.query_params.get('stream') == '1' or len(cert_ids) > VERIFY_STREAM_THRESHOLD:
+            def generate():
+                # A sync iterator, so Starlette drives it from a worker thread
+                verified = invalid = 0
+                for result in verdicts():
+                    if result["valid"]:
+                        verified += 1
+                    else:
+                        invalid += 1
+                    yield dumps(result) + b"\n"
+                yield dumps({"done": True, "verified": verified, "invalid": invalid}) + b"\n"
+
+            return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+        # One chain validation for the whole batch, off the event loop
+        results = await run_read(lambda: list(verdicts()))
+        verified = sum(1 for result in results if result["valid"])
+        return FastJSONResponse({
+            "success": True,
+            "results": results,
+            "verified": verified,
+            "invalid": len(results) - verified
+        })
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/events', methods=['GET'])
+async def stream_events(request):
+    """Server-sent events for new blocks, issuance, revocations and consent changes"""
+    try:
+        subscription = event_subscription(request.headers.get('last-event-id'), request.query_params)
+    except ValueError as e:
+        return error(str(e), 400)
+
+    async def generate():
+        # Woken from the publishing thread, so an idle stream holds no worker thread
+        loop = asyncio.get_running_loop()
+        published = asyncio.Event()
+
+        def listener():
+            try:
+                loop.call_soon_threadsafe(published.set)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+        system.events.add_listener(listener)
+        try:
+            yield PREAMBLE
+            for event in subscription.backlog:
+                yield format_event(event)
+            while True:
+                published.clear()
+                events = subscription.take()
+                for event in events:
+                    yield format_event(event)
+                if events:
+                    continue
+                try:
+                    await asyncio.wait_for(published.wait(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+        finally:
+            system.events.remove_listener(listener)
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@route('/api/verification-cache', methods=['GET'])
+async def get_verification_cache_stats(request):
+    """Get verification cache hit/miss counters"""
+    try:
+        return FastJSONResponse({"success": True, "cache": system.verification_cache.stats()})
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/student/consents/grant', methods=['POST'])
+async def grant_consent(request):
+    """Grant consent to HR"""
+    try:
+        data = await json_body(request)
+        student_username = data.get('student_username')
+        hr_username = data.get('hr_username')
+        cert_id = data.get('certificate_id')
+
+        if not student_username or not hr_username or not cert_id:
+            return error("All fields required", 400)
+
+        if hr_username not in system.users or system.users[hr_username]["role"] != "hr":
+            return error("Invalid HR username", 400)
+
+        if cert_id not in system.certificates:
+            return error("Certificate not found", 404)
+
+        consent_id = system.consent_manager.grant_consent(student_username, hr_username, cert_id)
+
+        return FastJSONResponse({
+            "success": True,
+            "consent_id": consent_id,
+            "message": "Consent granted successfully"
+        })
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/student/consents/revoke', methods=['POST'])
+async def revoke_consent(request):
+    """Revoke consent"""
+    try:
+        data = await json_body(request)
+        student_username = data.get('student_username')
+        consent_id = data.get('consent_id')
+
+        if not student_username or not consent_id:
+            return error("Username and consent ID required", 400)
+
+        success = system.consent_manager.revoke_consent(student_username, consent_id)
+
+        if success:
+            return FastJSONResponse({"success": True, "message": "Consent revoked successfully"})
+        else:
+            return error("Consent not found", 404)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/student/consents', methods=['GET'])
+async def get_consents(request):
+    """Get student consents"""
+    try:
+        username = request.query_params.get('username')
+
+        if not username:
+            return error("Username required", 400)
+
+        etag = system.view_tag(student=username)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        page = page_params(request.query_params)
+        if page:
+            consents, next_cursor = system.consent_manager.get_student_consents_page(username, *page)
+            return tagged(FastJSONResponse({"success": True, "consents": consents, "next_cursor": next_cursor}), etag)
+
+        consents = system.consent_manager.get_student_consents(username)
+
+        return tagged(FastJSONResponse({"success": True, "consents": consents}), etag)
+
+    except ValueError as e:
+        return error(str(e), 400)
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/student/download-certificate', methods=['GET'])
+async def download_certificate_pdf(request):
+    """Download certificate PDF"""
+    try:
+        cert_id = request.query_params.get('certificate_id')
+
+        if not cert_id:
+            return error("Certificate ID required", 400)
+
+        pdf_path = system.get_certificate_pdf_path(cert_id)
+
+        if not pdf_path:
+            return error("PDF not found for this certificate", 404)
+
+        # The ipfs_hash is the content hash, so it makes a strong ETag and the response is
+        # immutable. FileResponse handles Range/If-Range and uses pathsend where the server
+        # supports it.
+        ipfs_hash = system.get_certificate(cert_id).ipfs_hash
+        headers = {
+            "ETag": f'"{ipfs_hash}"',
+            "Cache-Control": f"private, max-age={PDF_MAX_AGE}, immutable"
+        }
+        if etag_matches(request.headers.get('if-none-match'), ipfs_hash):
+            return Response(status_code=304, headers=headers)
+
+        return FileResponse(pdf_path, media_type='application/pdf', filename=f'{cert_id}.pdf', headers=headers)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+# ==================== HR ENDPOINTS ====================
+
+@route('/api/hr/view-certificate', methods=['POST'])
+async def view_certificate_hr(request):
+    """View certificate with consent check"""
+    try:
+        data = await json_body(request)
+        cert_id = data.get('certificate_id')
+
+        if not cert_id:
+            return error("Certificate ID required", 400)
+
+        cert = system.get_certificate(cert_id)
+        if not cert:
+            return error("Certificate not found", 404)
+
+        has_consent = system.consent_manager.check_consent(cert.student_username, "HR023", cert_id)
+
+        return FastJSONResponse({
+            "success": True,
+            "has_consent": has_consent,
+            "revoked": system.is_revoked(cert_id),
+            "certificate": Fragment(cert.canonical_json()) if has_consent else None
+        })
+
+    except Exception as e:
+        return error(str(e), 500)
+
+@route('/api/hr/accessible-certificates', methods=['GET'])
+async def get_accessible_certificates(request):
+    """Get accessible certificates"""
+    try:
+        etag = system.view_tag(hr="HR023")
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        accessible = []
+        for cert_id, cert in list(system.certificates.items()):
+            if system.consent_manager.check_consent(cert.student_username, "HR023", cert_id):
+                accessible.append(json_fragment(cert.canonical_json(), revoked=system.is_revoked(cert_id)))
+
+        return tagged(FastJSONResponse({"success": True, "certificates": accessible}), etag)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+# ==================== APPLICATION ====================
+
+app = Starlette(
+    routes=routes,
+    # Enable CORS for Next.js frontend
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+        Middleware(TimingMiddleware),
+        Middleware(CompressionMiddleware)
+    ]
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("Starting EduLedger ASGI API Server on http://localhost:5000")
+    print("API endpoints available at http://localhost:5000/api")
+    uvicorn.run(app, host='0.0.0.0', port=5000)
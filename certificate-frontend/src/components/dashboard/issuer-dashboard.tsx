@@ -151,7 +151,8 @@ export function IssuerDashboard() {
         data += '==================================================\n'
         data += `Total Blocks: ${response.blockchain.total_blocks}\n`
         data += `Difficulty: ${response.blockchain.difficulty}\n`
-        data += `Chain Valid: ${response.blockchain.valid}\n\n`
+        data += `Chain Valid: ${response.blockchain.valid}\n`
+        data += `Showing Blocks: ${response.blockchain.from} - ${response.blockchain.to}\n\n`
         
         for (const block of response.blockchain.blocks) {
           data += `Block #${block.index}\n`
@@ -207,24 +208,12 @@ export function IssuerDashboard() {
     }
     
     try {
-      // Read PDF file if uploaded
-      let pdfData = null
-      if (pdfFile) {
-        const fileReader = new FileReader()
-        pdfData = await new Promise((resolve, reject) => {
-          fileReader.onload = (e) => resolve(e.target?.result)
-          fileReader.onerror = reject
-          fileReader.readAsDataURL(pdfFile)
-        })
-      }
-      
       const response = await api.issueCertificate({
         student_name: certStudentName,
         student_username: studentUsername,
         course: course,
-        grade: grade,
-        pdf_file: pdfData
-      })
+        grade: grade
+      }, pdfFile)
       
       if (response.success) {
         let result = `Certificate Issued Successfully\n\n`
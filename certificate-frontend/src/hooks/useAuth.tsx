@@ -41,6 +41,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
         setUser(response.user)
         if (typeof window !== 'undefined') {
           localStorage.setItem('user', JSON.stringify(response.user))
+          localStorage.setItem('token', response.token)
         }
         return true
       }
@@ -53,9 +54,12 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   }
 
   const logout = () => {
+    // End the server session too; the local state is cleared either way
+    api.logout().catch((error) => console.error('Logout error:', error))
     setUser(null)
     if (typeof window !== 'undefined') {
       localStorage.removeItem('user')
+      localStorage.removeItem('token')
     }
   }
 
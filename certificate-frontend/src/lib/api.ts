@@ -6,10 +6,13 @@ const API_BASE_URL = 'http://localhost:5000/api'
 
 async function apiCall(endpoint: string, options: RequestInit = {}) {
   try {
+    // Session token issued at login, sent as a bearer token
+    const token = typeof window !== 'undefined' ? localStorage.getItem('token') : null
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
       ...options,
       headers: {
         'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
         ...options.headers,
       },
     })
@@ -35,11 +38,12 @@ export const api = {
     })
   },
   
-  logout: async (username: string) => {
-    return apiCall('/auth/logout', {
-      method: 'POST',
-      body: JSON.stringify({ username }),
-    })
+  logout: async () => {
+    return apiCall('/auth/logout', { method: 'POST' })
+  },
+  
+  getSession: async () => {
+    return apiCall('/auth/session', { method: 'GET' })
   },
   
   // Issuer endpoints
@@ -58,19 +62,49 @@ export const api = {
     return apiCall('/issuer/students', { method: 'GET' })
   },
   
-  issueCertificate: async (data: any) => {
+  issueCertificate: async (data: any, pdfFile?: File | null) => {
+    if (pdfFile) {
+      // Send the PDF as the raw request body, with the certificate fields in the query string
+      const params = new URLSearchParams(data)
+      return apiCall(`/issuer/certificates?${params.toString()}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/pdf' },
+        body: pdfFile,
+      })
+    }
     return apiCall('/issuer/certificates', {
       method: 'POST',
       body: JSON.stringify(data),
     })
   },
   
+  // Queued issuance: returns a job at once; reuse idempotencyKey when retrying a submission
+  submitIssuanceJob: async (data: any, idempotencyKey: string, pdfFile?: File | null) => {
+    if (pdfFile) {
+      const params = new URLSearchParams(data)
+      return apiCall(`/issuer/certificates/jobs?${params.toString()}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/pdf', 'Idempotency-Key': idempotencyKey },
+        body: pdfFile,
+      })
+    }
+    return apiCall('/issuer/certificates/jobs', {
+      method: 'POST',
+      headers: { 'Idempotency-Key': idempotencyKey },
+      body: JSON.stringify(data),
+    })
+  },
+
+  getIssuanceJob: async (jobId: string) => {
+    return apiCall(`/issuer/certificates/jobs/${jobId}`, { method: 'GET' })
+  },
+
   getIssuerWallet: async () => {
     return apiCall('/issuer/wallet', { method: 'GET' })
   },
   
-  getBlockchain: async () => {
-    return apiCall('/issuer/blockchain', { method: 'GET' })
+  getBlockchain: async (limit: number = 50) => {
+    return apiCall(`/issuer/blockchain?limit=${limit}`, { method: 'GET' })
   },
   
   // Student endpoints
@@ -118,6 +152,17 @@ export const api = {
   getAccessibleCertificates: async () => {
     return apiCall('/hr/accessible-certificates', { method: 'GET' })
   },
+  
+  // Live events (server-sent). EventSource resumes from the last event ID on reconnect;
+  // sinceHeight replays global blocks after a height the caller has already seen.
+  subscribeEvents: (options: { types?: string[]; username?: string; sinceHeight?: number } = {}) => {
+    const params = new URLSearchParams()
+    if (options.types?.length) params.set('types', options.types.join(','))
+    if (options.username) params.set('username', options.username)
+    if (options.sinceHeight !== undefined) params.set('since_height', String(options.sinceHeight))
+    const query = params.toString()
+    return new EventSource(`${API_BASE_URL}/events${query ? `?${query}` : ''}`)
+  },
 }
 
 
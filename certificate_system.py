@@ -1,17 +1,47 @@
+import contextlib
+import csv
 import hashlib
+import io
+import itertools
 import json
+import threading
 import time
 import os
+import sqlite3
+import struct
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import gradio as gr
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.backends import default_backend
 import base64
+import bisect
+from analytics import IssuanceAnalytics
+from search_index import CertificateSearchIndex
+from issuance_jobs import IssuanceJobs
+from metrics import Counter, Gauge, Histogram
+from event_stream import EVENT_BUFFER_SIZE, EventLog, Subscription
+
+# ==================== METRICS ====================
+
+MINING_SECONDS = Histogram("eduledger_mining_seconds", "Time spent mining a block")
+MINING_NONCES = Histogram("eduledger_mining_nonces", "Nonces tried to mine a block",
+                          buckets=(10, 100, 1000, 10000, 100000, 1000000))
+SIGNING_SECONDS = Histogram("eduledger_signing_seconds", "Time spent signing a certificate",
+                            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+PDF_BYTES_INGESTED = Counter("eduledger_pdf_ingested_bytes_total", "PDF bytes written to the blob store")
+PDF_INGESTED = Counter("eduledger_pdf_ingested_total", "PDF uploads ingested, by whether the blob already existed",
+                       ("deduplicated",))
 
 # ==================== BLOCKCHAIN INFRASTRUCTURE ====================
 
+# Blocks per explorer page
+EXPLORER_PAGE_SIZE = 50
+
 class Block:
     def __init__(self, index: int, timestamp: float, data: dict, previous_hash: str):
         self.index = index
@@ -21,6 +51,28 @@ class Block:
         self.nonce = 0
         self.hash = self.calculate_hash()
     
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "data": self.data,
+            "previous_hash": self.previous_hash,
+            "nonce": self.nonce,
+            "hash": self.hash
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Block":
+        # Rebuild an already-mined block without recomputing its hash
+        block = cls.__new__(cls)
+        block.index = data["index"]
+        block.timestamp = data["timestamp"]
+        block.data = data["data"]
+        block.previous_hash = data["previous_hash"]
+        block.nonce = data["nonce"]
+        block.hash = data["hash"]
+        return block
+    
     def calculate_hash(self) -> str:
         block_string = json.dumps({
             "index": self.index,
@@ -32,44 +84,143 @@ class Block:
         return hashlib.sha256(block_string.encode()).hexdigest()
     
     def mine_block(self, difficulty: int):
+        # Serialize everything except the nonce once; produces the same digest as calculate_hash
+        started = time.perf_counter()
         target = "0" * difficulty
+        prefix = json.dumps({
+            "data": self.data,
+            "index": self.index
+        }, sort_keys=True)[:-1] + ', "nonce": '
+        suffix = ", " + json.dumps({
+            "previous_hash": self.previous_hash,
+            "timestamp": self.timestamp
+        }, sort_keys=True)[1:]
         while self.hash[:difficulty] != target:
             self.nonce += 1
-            self.hash = self.calculate_hash()
+            self.hash = hashlib.sha256(f"{prefix}{self.nonce}{suffix}".encode()).hexdigest()
+        MINING_SECONDS.observe(time.perf_counter() - started)
+        MINING_NONCES.observe(self.nonce + 1)
 
 class Blockchain:
-    def __init__(self):
+    def __init__(self, partition: Optional[str] = None):
+        self.partition = partition
         self.chain = [self.create_genesis_block()]
         self.difficulty = 2
         self.pending_transactions = []
+        # Single writer for appends; readers only ever see fully mined blocks
+        self._append_lock = threading.Lock()
+        # Validity cache: tip hash and height of the last validated chain, and the verdict
+        self._validated_tip = None
+        self._validated_height = 0
+        self._valid = True
+        self._validity_lock = threading.Lock()
     
     def create_genesis_block(self) -> Block:
-        return Block(0, time.time(), {"type": "genesis"}, "0")
+        data = {"type": "genesis"}
+        if self.partition:
+            data["partition"] = self.partition
+        return Block(0, time.time(), data, "0")
     
     def get_latest_block(self) -> Block:
         return self.chain[-1]
     
     def add_block(self, data: dict) -> Block:
-        new_block = Block(
-            len(self.chain),
-            time.time(),
-            data,
-            self.get_latest_block().hash
-        )
-        new_block.mine_block(self.difficulty)
-        self.chain.append(new_block)
+        with self._append_lock:
+            new_block = Block(
+                len(self.chain),
+                time.time(),
+                data,
+                self.get_latest_block().hash
+            )
+            new_block.mine_block(self.difficulty)
+            self.chain.append(new_block)
         return new_block
     
     def is_chain_valid(self) -> bool:
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+        return self._blocks_valid(self.chain, 1, len(self.chain))
+    
+    def is_chain_valid_cached(self) -> bool:
+        # is_chain_valid for read-mostly callers such as the explorer, cached by tip hash.
+        # Blocks are never modified once appended, so when the last validated tip is still
+        # in place only the blocks appended since then need checking. Verification keeps
+        # using the full is_chain_valid.
+        chain = self.chain
+        height = len(chain) - 1
+        tip = chain[height]
+        with self._validity_lock:
+            if tip.hash == self._validated_tip:
+                return self._valid
+            
+            if (self._validated_tip is not None and self._validated_height <= height
+                    and chain[self._validated_height].hash == self._validated_tip):
+                valid = self._valid and self._blocks_valid(chain, self._validated_height + 1, height + 1)
+            else:
+                valid = self._blocks_valid(chain, 1, height + 1)
+            
+            self._validated_tip = tip.hash
+            self._validated_height = height
+            self._valid = valid
+            return valid
+    
+    @staticmethod
+    def _blocks_valid(chain: List[Block], start: int, end: int) -> bool:
+        for i in range(max(start, 1), end):
+            current_block = chain[i]
+            previous_block = chain[i - 1]
             
             if current_block.hash != current_block.calculate_hash():
                 return False
             if current_block.previous_hash != previous_block.hash:
                 return False
         return True
+    
+    def get_blocks(self, start: Optional[int] = None, end: Optional[int] = None,
+                   limit: int = EXPLORER_PAGE_SIZE) -> List[Block]:
+        # Blocks start..end inclusive, at most limit of them. With no start the window
+        # ends at end (default: the tip), so the default is the latest blocks.
+        if (start is not None and start < 0) or (end is not None and end < 0):
+            raise ValueError("Block heights must not be negative")
+        height = len(self.chain) - 1
+        limit = max(1, limit)
+        if start is None:
+            end = height if end is None else min(end, height)
+            start = max(0, end - limit + 1)
+        else:
+            start = max(0, start)
+            end = min(height if end is None else end, start + limit - 1, height)
+        return self.chain[start:end + 1]
+
+def block_certificates(block: Block) -> List[dict]:
+    if block.data.get("type") == "certificate_issued":
+        return [block.data.get("certificate", {})]
+    if block.data.get("type") == "certificate_batch_issued":
+        return block.data.get("certificates", [])
+    return []
+
+# Explorer view of a block, one entry per selectable field
+BLOCK_FIELDS = {
+    "index": lambda block: block.index,
+    "timestamp": lambda block: datetime.fromtimestamp(block.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+    "hash": lambda block: block.hash,
+    "previous_hash": lambda block: block.previous_hash,
+    "nonce": lambda block: block.nonce,
+    "data_type": lambda block: block.data.get('type', 'unknown'),
+    "data": lambda block: block.data,
+}
+HEADER_FIELDS = tuple(field for field in BLOCK_FIELDS if field != "data")
+
+def block_view(block: Block, fields: Iterable[str] = BLOCK_FIELDS) -> dict:
+    return {field: BLOCK_FIELDS[field](block) for field in fields}
+
+# Compact summary of a block for the event stream
+def block_event(block: Block, ledger: str) -> dict:
+    return {
+        "ledger": ledger,
+        "height": block.index,
+        "hash": block.hash,
+        "block_type": block.data.get('type', 'unknown'),
+        "certificates": len(block_certificates(block))
+    }
 
 # ==================== WALLET SYSTEM ====================
 
@@ -83,6 +234,26 @@ class Wallet:
         )
         self.public_key = self.private_key.public_key()
     
+    @classmethod
+    def from_private_key(cls, owner: str, private_pem: str) -> "Wallet":
+        wallet = cls.__new__(cls)
+        wallet.owner = owner
+        wallet.private_key = serialization.load_pem_private_key(
+            private_pem.encode(),
+            password=None,
+            backend=default_backend()
+        )
+        wallet.public_key = wallet.private_key.public_key()
+        return wallet
+    
+    def export_private_key(self) -> str:
+        private_pem = self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        return private_pem.decode()
+    
     def sign_data(self, data: str) -> str:
         signature = self.private_key.sign(
             data.encode(),
@@ -123,20 +294,57 @@ class Certificate:
         self.ipfs_hash = None
         self.pdf_signature = None
     
+    def __setattr__(self, name, value):
+        # Any change to a public field invalidates the cached canonical encoding
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            self._invalidate()
+    
+    def _invalidate(self):
+        object.__setattr__(self, "_canonical", None)
+    
+    def _encode(self) -> Tuple[dict, str]:
+        # Computed once per change to the certificate: (dict, canonical JSON)
+        canonical = self._canonical
+        if canonical is None:
+            data = {
+                "cert_id": self.cert_id,
+                "student_name": self.student_name,
+                "student_username": self.student_username,
+                "course": self.course,
+                "grade": self.grade,
+                "issue_date": self.issue_date,
+                "issuer": self.issuer,
+                "signatures": [dict(sig) for sig in self.signatures],
+                "blockchain_hash": self.blockchain_hash,
+                "ipfs_hash": self.ipfs_hash,
+                "pdf_signature": self.pdf_signature
+            }
+            canonical = (data, json.dumps(data, sort_keys=True))
+            object.__setattr__(self, "_canonical", canonical)
+        return canonical
+    
     def to_dict(self) -> dict:
-        return {
-            "cert_id": self.cert_id,
-            "student_name": self.student_name,
-            "student_username": self.student_username,
-            "course": self.course,
-            "grade": self.grade,
-            "issue_date": self.issue_date,
-            "issuer": self.issuer,
-            "signatures": self.signatures,
-            "blockchain_hash": self.blockchain_hash,
-            "ipfs_hash": self.ipfs_hash,
-            "pdf_signature": self.pdf_signature
-        }
+        # Shallow copy, so callers may add keys without touching the cache
+        return dict(self._encode()[0])
+    
+    def canonical_dict(self) -> dict:
+        # Shared, read-only view of the current fields (used for block payloads)
+        return self._encode()[0]
+    
+    def canonical_json(self) -> str:
+        return self._encode()[1]
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Certificate":
+        cert = cls(data["cert_id"], data["student_name"], data["student_username"], data["course"],
+                   data["grade"], data["issue_date"], data["issuer"])
+        cert.signatures = [dict(sig) for sig in data.get("signatures", [])]
+        cert.blockchain_hash = data.get("blockchain_hash")
+        cert.pdf_file_path = data.get("pdf_file_path")
+        cert.ipfs_hash = data.get("ipfs_hash")
+        cert.pdf_signature = data.get("pdf_signature")
+        return cert
     
     def add_signature(self, signer: str, signature: str):
         self.signatures.append({
@@ -144,35 +352,213 @@ class Certificate:
             "signature": signature[:64],
             "timestamp": datetime.now().isoformat()
         })
+        self._invalidate()
+
+# ==================== PAGINATION ====================
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(position: int) -> str:
+    return base64.urlsafe_b64encode(f"p:{position}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, position = decoded.split(":", 1)
+        if prefix == "p" and int(position) >= 0:
+            return int(position)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    raise ValueError("Invalid cursor")
+
+def paginate(items: list, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE) -> Tuple[list, Optional[str]]:
+    # Listings are append-only, so a position cursor stays stable as new items arrive
+    # and each page costs O(page size)
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    start = decode_cursor(cursor)
+    page = items[start:start + limit]
+    next_cursor = encode_cursor(start + limit) if start + limit < len(items) else None
+    return page, next_cursor
+
+# ==================== PDF STORAGE ====================
+
+PDF_CHUNK_SIZE = 1024 * 1024
+
+def ipfs_hash_from_digest(digest: bytes) -> str:
+    # Simulate IPFS hash generation from a SHA-256 digest
+    return "Qm" + base64.b32encode(digest).decode()[:44]
+
+class PDFStore:
+    # Content-addressed blob store keyed by the simulated IPFS hash.
+    # Blobs fan out into two directory levels so no single directory grows unbounded,
+    # and each blob is reference counted so identical PDFs are stored once. The counts
+    # live in SQLite inside the store, so every process sharing the directory agrees
+    # on when a blob may be deleted. Certificates are never deleted (revoked ones keep
+    # their PDF), so a reference is only released when an issuance fails after ingest.
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.refs_path = os.path.join(root_dir, "refs.db")
+        self._local = threading.local()
+        os.makedirs(self.root_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS blob_refs (ipfs_hash TEXT PRIMARY KEY, refs INTEGER NOT NULL)")
+    
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; writes take the database lock up front (BEGIN IMMEDIATE)
+        # so a count and the file it guards change together
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.refs_path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+    
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def blob_path(self, ipfs_hash: str) -> str:
+        key = ipfs_hash[2:] if ipfs_hash.startswith("Qm") else ipfs_hash
+        return os.path.join(self.root_dir, key[:2], key[2:4], f"{ipfs_hash}.pdf")
+    
+    def ingest(self, stream) -> Tuple[str, str, str, int]:
+        # Single pass over the upload: each chunk updates the digest and goes straight
+        # to disk, so memory use is constant regardless of PDF size.
+        # Returns (ipfs_hash, sha256 hex digest, blob path, size in bytes).
+        hasher = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.root_dir, f".ingest-{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    chunk = stream.read(PDF_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            
+            ipfs_hash = ipfs_hash_from_digest(hasher.digest())
+            path = self.blob_path(ipfs_hash)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            
+            # Publish atomically; a blob that already exists is simply referenced again
+            with self._transaction() as conn:
+                deduplicated = os.path.exists(path)
+                if deduplicated:
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, path)
+                self._increment(conn, ipfs_hash)
+            PDF_BYTES_INGESTED.inc(size)
+            PDF_INGESTED.inc(deduplicated=str(deduplicated).lower())
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        return ipfs_hash, hasher.hexdigest(), path, size
+    
+    def release(self, ipfs_hash: str) -> bool:
+        # Drop one reference; the blob is deleted with its last one
+        with self._transaction() as conn:
+            row = conn.execute("SELECT refs FROM blob_refs WHERE ipfs_hash = ?", (ipfs_hash,)).fetchone()
+            if row is None:
+                return False
+            if row[0] > 1:
+                conn.execute("UPDATE blob_refs SET refs = refs - 1 WHERE ipfs_hash = ?", (ipfs_hash,))
+                return True
+            conn.execute("DELETE FROM blob_refs WHERE ipfs_hash = ?", (ipfs_hash,))
+            path = self.blob_path(ipfs_hash)
+            if os.path.exists(path):
+                os.remove(path)
+            return True
+    
+    @staticmethod
+    def _increment(conn: sqlite3.Connection, ipfs_hash: str):
+        conn.execute(
+            "INSERT INTO blob_refs (ipfs_hash, refs) VALUES (?, 1) "
+            "ON CONFLICT(ipfs_hash) DO UPDATE SET refs = refs + 1",
+            (ipfs_hash,)
+        )
+    
+    def get_path(self, ipfs_hash: str) -> Optional[str]:
+        path = self.blob_path(ipfs_hash)
+        return path if os.path.exists(path) else None
+
+# ==================== VIEW VERSIONS ====================
+
+class VersionCounters:
+    # Per-key change counters (student or HR username). Together with the chain tip they
+    # identify a version of that user's views, so the API can answer polls with 304.
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def bump(self, key: str):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+    
+    def get(self, key: str) -> int:
+        return self.counts.get(key, 0)
 
 # ==================== CONSENT MANAGEMENT ====================
 
 class ConsentManager:
-    def __init__(self):
+    def __init__(self, student_versions: Optional[VersionCounters] = None,
+                 hr_versions: Optional[VersionCounters] = None,
+                 events: Optional[EventLog] = None):
         self.consents = {}
+        self.consent_order = {}
+        self.student_versions = student_versions or VersionCounters()
+        self.hr_versions = hr_versions or VersionCounters()
+        self.events = events or EventLog()
+        self._lock = threading.Lock()
     
     def grant_consent(self, student: str, hr: str, cert_id: str) -> str:
         consent_id = hashlib.sha256(f"{student}{hr}{cert_id}{time.time()}".encode()).hexdigest()[:16]
-        if student not in self.consents:
-            self.consents[student] = {}
-        self.consents[student][consent_id] = {
-            "hr": hr,
-            "cert_id": cert_id,
-            "granted_at": datetime.now().isoformat(),
-            "status": "active"
-        }
+        with self._lock:
+            if student not in self.consents:
+                self.consents[student] = {}
+                self.consent_order[student] = []
+            self.consents[student][consent_id] = {
+                "hr": hr,
+                "cert_id": cert_id,
+                "granted_at": datetime.now().isoformat(),
+                "status": "active"
+            }
+            self.consent_order[student].append(consent_id)
+        self.student_versions.bump(student)
+        self.hr_versions.bump(hr)
+        self.events.publish("consent_granted", consent_id=consent_id, student=student, hr=hr, cert_id=cert_id)
         return consent_id
     
     def revoke_consent(self, student: str, consent_id: str) -> bool:
-        if student in self.consents and consent_id in self.consents[student]:
-            self.consents[student][consent_id]["status"] = "revoked"
-            return True
-        return False
+        with self._lock:
+            if student in self.consents and consent_id in self.consents[student]:
+                consent = self.consents[student][consent_id]
+                consent["status"] = "revoked"
+            else:
+                return False
+        self.student_versions.bump(student)
+        self.hr_versions.bump(consent["hr"])
+        self.events.publish("consent_revoked", consent_id=consent_id, student=student, hr=consent["hr"],
+                            cert_id=consent["cert_id"])
+        return True
     
     def check_consent(self, student: str, hr: str, cert_id: str) -> bool:
         if student not in self.consents:
             return False
-        for consent in self.consents[student].values():
+        for consent in list(self.consents[student].values()):
             if consent["hr"] == hr and consent["cert_id"] == cert_id and consent["status"] == "active":
                 return True
         return False
@@ -180,31 +566,213 @@ class ConsentManager:
     def get_student_consents(self, student: str) -> List[dict]:
         if student not in self.consents:
             return []
-        return [{"consent_id": k, **v} for k, v in self.consents[student].items()]
+        return [{"consent_id": k, **v} for k, v in list(self.consents[student].items())]
+    
+    def get_student_consents_page(self, student: str, cursor: Optional[str] = None,
+                                  limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[dict], Optional[str]]:
+        consent_ids, next_cursor = paginate(self.consent_order.get(student, []), cursor, limit)
+        consents = self.consents.get(student, {})
+        return [{"consent_id": cid, **consents[cid]} for cid in consent_ids], next_cursor
+    
+    def export_consents(self) -> dict:
+        # Copy taken under the lock, since revoke_consent updates entries in place
+        with self._lock:
+            return {student: {consent_id: dict(consent) for consent_id, consent in entries.items()}
+                    for student, entries in self.consents.items()}
+    
+    def load_consents(self, consents: dict):
+        with self._lock:
+            self.consents = consents
+            self.consent_order = {student: list(entries) for student, entries in consents.items()}
+
+# ==================== VERIFICATION CACHE ====================
+
+class VerificationCache:
+    # Bounded LRU cache of verification verdicts with a TTL. Keys include the chain
+    # tip and revocation epoch, so any new block or revocation makes old entries unreachable.
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: tuple) -> Optional[Tuple[bool, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key: tuple, verdict: Tuple[bool, str]):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl
+        }
+
+# ==================== REVOCATION ====================
+
+def certificate_ordinal(cert_id: str) -> int:
+    # Certificate IDs are allocated from a monotonic counter, so the numeric suffix is a dense ordinal
+    return int(cert_id.split("-")[-1])
+
+class RevocationBitmap:
+    # One bit per certificate ordinal, plus a height-ordered change log so offline
+    # verifiers can fetch only the revocations since the height they last synced.
+    def __init__(self):
+        self.bits = bytearray()
+        self.log = []
+        self._lock = threading.Lock()
+    
+    def set(self, ordinal: int, height: int):
+        with self._lock:
+            byte_index = ordinal >> 3
+            if byte_index >= len(self.bits):
+                self.bits.extend(bytes(byte_index - len(self.bits) + 1))
+            self.bits[byte_index] |= 1 << (ordinal & 7)
+            self.log.append((height, ordinal))
+    
+    def is_set(self, ordinal: int) -> bool:
+        byte_index = ordinal >> 3
+        return byte_index < len(self.bits) and bool(self.bits[byte_index] >> (ordinal & 7) & 1)
+    
+    def delta_since(self, height: int) -> List[Tuple[int, int]]:
+        # (height, ordinal) pairs recorded strictly after the given height
+        start = bisect.bisect_right(self.log, (height, float("inf")))
+        return self.log[start:]
+    
+    def to_state(self) -> dict:
+        return {"bits": base64.b64encode(bytes(self.bits)).decode(), "log": self.log}
+    
+    def load_state(self, state: dict):
+        with self._lock:
+            self.bits = bytearray(base64.b64decode(state["bits"]))
+            self.log = [tuple(entry) for entry in state["log"]]
+
+# ==================== BULK ISSUANCE ====================
+
+BULK_CHUNK_SIZE = 500
+# Largest chunk_size a request may ask for; each chunk is held in memory while it is signed
+MAX_BULK_CHUNK_SIZE = 5000
+BULK_REQUIRED_FIELDS = ("student_name", "student_username", "course", "grade")
+
+def iter_bulk_rows(source, fmt: Optional[str] = None) -> Iterator[Optional[dict]]:
+    # Accepts a file path, a text/binary file-like object or an iterable of lines.
+    # Rows are yielded one at a time; malformed JSONL lines are yielded as None.
+    if isinstance(source, str):
+        if fmt is None:
+            fmt = "csv" if source.lower().endswith(".csv") else "jsonl"
+        with open(source, "r", encoding="utf-8-sig", newline="") as f:
+            yield from iter_bulk_rows(f, fmt)
+        return
+    
+    if hasattr(source, "read") and not isinstance(source, io.TextIOBase):
+        # utf-8-sig drops the byte order mark spreadsheet exports put before the header
+        source = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    else:
+        source = (line.decode("utf-8") if isinstance(line, bytes) else line for line in source)
+    
+    if (fmt or "jsonl").lower() == "csv":
+        for row in csv.DictReader(source):
+            yield {k.strip(): (v or "").strip() for k, v in row.items() if k}
+        return
+    
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
 
 # ==================== SYSTEM STATE ====================
 
+SNAPSHOT_MAGIC = b"EDLSNAP\0"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct(">8sH")
+
+def normalize_name(full_name: str) -> str:
+    return " ".join(full_name.split()).casefold()
+
 class CertificateSystem:
-    def __init__(self):
+    def __init__(self, partitioned: bool = False, anchor_interval: int = 10):
+        # Global chain; in partitioned mode it carries partition anchors instead of issuances
         self.blockchain = Blockchain()
+        self.partitioned = partitioned
+        self.partitions = {}
+        self.anchor_interval = anchor_interval
+        self.anchored_tips = {}
+        self._blocks_since_anchor = 0
         self.wallets = {}
         self.certificates = {}
         self.users = {
             "issuer324": {"password": "isse324", "role": "issuer", "name": "Institute XYZ"},
             "HR023": {"password": "hr023", "role": "hr", "name": "TechCorp HR"}
         }
-        self.consent_manager = ConsentManager()
+        self.users_by_role = {}
+        self.students_by_name = {}
+        self.student_versions = VersionCounters()
+        self.hr_versions = VersionCounters()
+        self.events = EventLog()
+        self.consent_manager = ConsentManager(self.student_versions, self.hr_versions, self.events)
         self.student_certificates = {}
         self.issuer_stats = {}
+        self.analytics = IssuanceAnalytics()
+        self.issuance_jobs = IssuanceJobs(self._issue_job)
+        self.search_index = CertificateSearchIndex()
+        self.certificate_blocks = {}
+        self.verification_cache = VerificationCache()
+        self.revocation_epoch = 0
+        self.revocations = {}
+        self.revocation_bitmap = RevocationBitmap()
+        self.cert_counter = 0
         self.pdf_storage_dir = "/tmp/certificates"
         self.current_logged_user = None
         
-        # Create PDF storage directory
-        os.makedirs(self.pdf_storage_dir, exist_ok=True)
+        # Writers (registration, certificate storage) serialize on these locks;
+        # readers use plain dict/list lookups and never block
+        self._write_lock = threading.RLock()
+        self._id_lock = threading.Lock()
+        self._anchor_lock = threading.Lock()
+        self._revoke_lock = threading.Lock()
         
-        # Initialize wallets
+        # Create PDF storage
+        self.pdf_store = PDFStore(self.pdf_storage_dir)
+        
+        # Initialize wallets and user indexes
         for username in self.users.keys():
             self.wallets[username] = Wallet(username)
+            self._index_user(username)
+    
+    def _index_user(self, username: str):
+        user_data = self.users[username]
+        self.users_by_role.setdefault(user_data["role"], []).append(username)
+        if user_data["role"] == "student":
+            self.students_by_name.setdefault(normalize_name(user_data["name"]), []).append(username)
     
     def authenticate(self, username: str, password: str) -> Tuple[bool, str, str]:
         if username in self.users and self.users[username]["password"] == password:
@@ -216,108 +784,353 @@ class CertificateSystem:
         if username in self.users:
             return False, "Username already exists"
         
-        self.users[username] = {
-            "password": password,
-            "role": "student",
-            "name": full_name
-        }
-        self.wallets[username] = Wallet(username)
+        # Key generation is slow, so do it before taking the write lock
+        wallet = Wallet(username)
+        with self._write_lock:
+            if username in self.users:
+                return False, "Username already exists"
+            self.wallets[username] = wallet
+            self.users[username] = {
+                "password": password,
+                "role": "student",
+                "name": full_name
+            }
+            self._index_user(username)
         return True, f"Student {username} added successfully"
     
+    def add_issuer(self, username: str, password: str, name: str) -> Tuple[bool, str]:
+        if username in self.users:
+            return False, "Username already exists"
+        
+        wallet = Wallet(username)
+        with self._write_lock:
+            if username in self.users:
+                return False, "Username already exists"
+            self.wallets[username] = wallet
+            self.users[username] = {
+                "password": password,
+                "role": "issuer",
+                "name": name
+            }
+            self._index_user(username)
+        return True, f"Issuer {username} added successfully"
+    
     def get_student_by_name(self, full_name: str) -> Optional[str]:
-        for username, user_data in self.users.items():
-            if user_data["role"] == "student" and user_data["name"] == full_name:
-                return username
-        return None
+        usernames = self.students_by_name.get(normalize_name(full_name))
+        return usernames[0] if usernames else None
     
     def get_all_students(self) -> List[dict]:
         students = []
-        for username, user_data in self.users.items():
-            if user_data["role"] == "student":
-                students.append({
-                    "username": username,
-                    "name": user_data["name"],
-                    "wallet_address": self.wallets[username].get_address()
-                })
+        for username in list(self.users_by_role.get("student", [])):
+            students.append({
+                "username": username,
+                "name": self.users[username]["name"],
+                "wallet_address": self.wallets[username].get_address()
+            })
         return students
     
+    def get_students_page(self, cursor: Optional[str] = None,
+                          limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[dict], Optional[str]]:
+        usernames, next_cursor = paginate(self.users_by_role.get("student", []), cursor, limit)
+        students = [{
+            "username": username,
+            "name": self.users[username]["name"],
+            "wallet_address": self.wallets[username].get_address()
+        } for username in usernames]
+        return students, next_cursor
+    
+    # ==================== LEDGER PARTITIONS ====================
+    
+    def ledger_for(self, issuer: str) -> Blockchain:
+        # Each issuer appends to its own partition chain, so issuers never contend on one tip
+        if not self.partitioned:
+            return self.blockchain
+        ledger = self.partitions.get(issuer)
+        if ledger is None:
+            with self._write_lock:
+                ledger = self.partitions.get(issuer)
+                if ledger is None:
+                    ledger = Blockchain(partition=issuer)
+                    ledger.difficulty = self.blockchain.difficulty
+                    self.partitions[issuer] = ledger
+        return ledger
+    
+    def _append_certificate_block(self, issuer: str, block_data: dict) -> Block:
+        ledger = self.ledger_for(issuer)
+        block = ledger.add_block(block_data)
+        self._publish_block(block, ledger)
+        if self.partitioned:
+            with self._anchor_lock:
+                self._blocks_since_anchor += 1
+                due = self._blocks_since_anchor >= self.anchor_interval
+            if due:
+                self.anchor_partitions()
+        return block
+    
+    def anchor_partitions(self) -> Optional[Block]:
+        # Commit every partition tip that moved since the last anchor into the global chain
+        with self._anchor_lock:
+            tips = {}
+            for issuer, ledger in list(self.partitions.items()):
+                tip = ledger.get_latest_block()
+                if self.anchored_tips.get(issuer, {}).get("hash") != tip.hash:
+                    tips[issuer] = {"height": tip.index, "hash": tip.hash}
+            self._blocks_since_anchor = 0
+            if not tips:
+                return None
+            block = self.blockchain.add_block({"type": "partition_anchor", "partitions": tips})
+            self.anchored_tips.update(tips)
+            self._publish_block(block, self.blockchain)
+            return block
+    
+    def _publish_block(self, block: Block, ledger: "Blockchain"):
+        self.events.publish("block", **block_event(block, ledger.partition or "global"))
+    
+    def subscribe_events(self, last_event_id: Optional[int] = None, since_height: Optional[int] = None,
+                         types: Optional[Iterable[str]] = None, username: Optional[str] = None) -> Subscription:
+        # Resume after an event ID when the client has one. A client that only knows the
+        # global chain height it has seen gets the later blocks replayed from the chain, then
+        # live events; a gap larger than the event buffer means a reset (reload) instead.
+        # since_height=0 replays every block after the (empty) genesis block.
+        if since_height is not None and since_height < 0:
+            raise ValueError("since_height must not be negative")
+        if last_event_id is not None:
+            return Subscription(self.events, last_event_id, types, username)
+        cursor = self.events.last_id
+        if since_height is None:
+            return Subscription(self.events, cursor, types, username)
+        chain = self.blockchain.chain
+        if len(chain) - 1 - since_height > EVENT_BUFFER_SIZE:
+            return Subscription(self.events, cursor, types, username, [{"type": "reset"}])
+        backlog = [{"type": "block", **block_event(block, "global")} for block in chain[since_height + 1:]]
+        return Subscription(self.events, cursor, types, username, backlog, len(chain) - 1)
+    
     def generate_ipfs_hash(self, file_content: bytes) -> str:
-        # Simulate IPFS hash generation using SHA-256
-        hash_obj = hashlib.sha256(file_content)
-        return "Qm" + base64.b32encode(hash_obj.digest()).decode()[:44]
+        return ipfs_hash_from_digest(hashlib.sha256(file_content).digest())
     
     def issue_certificate(self, issuer: str, student_name: str, student_username: str, 
                          course: str, grade: str, pdf_file = None) -> Tuple[bool, str, dict]:
-        cert_id = f"CERT-{len(self.certificates) + 1:04d}"
-        issue_date = datetime.now().strftime("%Y-%m-%d")
-        
-        cert = Certificate(cert_id, student_name, student_username, course, grade, issue_date, issuer)
-        
-        # Handle PDF upload and IPFS storage
+        # Handle PDF upload and IPFS storage. A PDF that cannot be stored in full (e.g. the
+        # client disconnected mid-upload) aborts the issuance instead of issuing without it.
+        # The certificate ID is only allocated once the PDF is stored, so a failed upload
+        # leaves no gap in the sequence.
+        ipfs_hash = pdf_hash = pdf_path = None
         if pdf_file is not None:
             try:
-                # Read PDF file
-                pdf_content = pdf_file if isinstance(pdf_file, bytes) else open(pdf_file.name, 'rb').read()
-                
-                # Generate IPFS hash
-                cert.ipfs_hash = self.generate_ipfs_hash(pdf_content)
-                
-                # Store PDF locally
-                pdf_filename = f"{cert_id}.pdf"
-                pdf_path = os.path.join(self.pdf_storage_dir, pdf_filename)
-                with open(pdf_path, 'wb') as f:
-                    f.write(pdf_content)
-                cert.pdf_file_path = pdf_path
-                
-                # Sign PDF
-                pdf_hash = hashlib.sha256(pdf_content).hexdigest()
-                cert.pdf_signature = self.wallets[issuer].sign_data(pdf_hash)
+                # Stream PDF into the store, hashing it in the same pass
+                stream, owned = self._open_pdf_source(pdf_file)
+                try:
+                    ipfs_hash, pdf_hash, pdf_path, _ = self.pdf_store.ingest(stream)
+                finally:
+                    if owned:
+                        stream.close()
             except Exception as e:
-                print(f"Error processing PDF: {e}")
+                return False, f"PDF upload failed: {e}", {}
         
-        # Sign certificate
-        cert_data = json.dumps(cert.to_dict(), sort_keys=True)
-        signature = self.wallets[issuer].sign_data(cert_data)
-        cert.add_signature(issuer, signature)
+        cert = self._new_certificate(issuer, student_name, student_username, course, grade)
+        cert.ipfs_hash, cert.pdf_file_path = ipfs_hash, pdf_path
         
-        # Add to blockchain
-        block_data = {
-            "type": "certificate_issued",
-            "certificate": cert.to_dict(),
-            "issuer_address": self.wallets[issuer].get_address()
-        }
-        block = self.blockchain.add_block(block_data)
+        try:
+            # Sign PDF
+            if cert.ipfs_hash:
+                cert.pdf_signature = self.wallets[issuer].sign_data(pdf_hash)
+            
+            # Sign certificate
+            self._sign_certificate(issuer, cert)
+            
+            # Add to blockchain
+            block_data = {
+                "type": "certificate_issued",
+                "certificate": cert.canonical_dict(),
+                "issuer_address": self.wallets[issuer].get_address()
+            }
+            block = self._append_certificate_block(issuer, block_data)
+        except Exception:
+            # Nothing was committed, so drop this certificate's reference to the PDF
+            if cert.ipfs_hash:
+                self.pdf_store.release(cert.ipfs_hash)
+            raise
         cert.blockchain_hash = block.hash
         
-        # Store certificate
-        self.certificates[cert_id] = cert
-        
-        # Update student certificates by username
-        if student_username not in self.student_certificates:
-            self.student_certificates[student_username] = []
-        self.student_certificates[student_username].append(cert_id)
-        
-        # Update issuer stats
-        if issuer not in self.issuer_stats:
-            self.issuer_stats[issuer] = {"total_issued": 0, "by_student": {}}
-        self.issuer_stats[issuer]["total_issued"] += 1
-        if student_name not in self.issuer_stats[issuer]["by_student"]:
-            self.issuer_stats[issuer]["by_student"][student_name] = 0
-        self.issuer_stats[issuer]["by_student"][student_name] += 1
+        self._store_certificate(cert, block.index)
         
-        return True, cert_id, cert.to_dict()
+        return True, cert.cert_id, cert.to_dict()
+    
+    def _issue_job(self, issuer: str, fields: dict, pdf_file=None) -> dict:
+        # Worker side of an issuance job; any exception marks the job failed
+        success, cert_id, cert_data = self.issue_certificate(
+            issuer, fields["student_name"], fields["student_username"], fields["course"], fields["grade"], pdf_file
+        )
+        if not success:
+            raise RuntimeError(cert_id)
+        return {
+            "certificate_id": cert_id,
+            "block_hash": cert_data["blockchain_hash"],
+            "block_height": self.certificate_blocks[cert_id]
+        }
+    
+    def _open_pdf_source(self, pdf_file):
+        # Accepts raw bytes, a file path, an uploaded-file object with a .name path,
+        # or any binary stream. Returns (stream, whether the caller must close it).
+        if isinstance(pdf_file, (bytes, bytearray)):
+            return io.BytesIO(pdf_file), True
+        if isinstance(pdf_file, str):
+            return open(pdf_file, 'rb'), True
+        if hasattr(pdf_file, "read"):
+            return pdf_file, False
+        return open(pdf_file.name, 'rb'), True
+    
+    def issue_certificates_bulk(self, issuer: str, rows: Iterable[Optional[dict]],
+                                chunk_size: int = BULK_CHUNK_SIZE,
+                                max_workers: Optional[int] = None) -> Iterator[dict]:
+        # Checked here rather than in the generator, so a bad chunk_size fails before any
+        # result has been streamed
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        return self._issue_bulk_chunks(issuer, rows, chunk_size, max_workers)
+    
+    def _issue_bulk_chunks(self, issuer: str, rows: Iterable[Optional[dict]], chunk_size: int,
+                           max_workers: Optional[int]) -> Iterator[dict]:
+        # Rows are consumed lazily, chunk by chunk, so memory stays bounded by chunk_size.
+        # Each chunk is signed in parallel and committed to the chain as a single block.
+        numbered = enumerate(rows, start=1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                chunk = list(itertools.islice(numbered, chunk_size))
+                if not chunk:
+                    break
+                
+                # Validate rows
+                results = {}
+                certs = []
+                for row_number, row in chunk:
+                    error = self._validate_bulk_row(row)
+                    if error:
+                        results[row_number] = {"row": row_number, "success": False, "message": error}
+                        continue
+                    cert = self._new_certificate(issuer, row["student_name"], row["student_username"],
+                                                 row["course"], row["grade"])
+                    certs.append((row_number, cert))
+                
+                # Sign certificates in parallel
+                list(executor.map(lambda item: self._sign_certificate(issuer, item[1]), certs))
+                
+                # Commit the whole chunk as one block
+                if certs:
+                    block_data = {
+                        "type": "certificate_batch_issued",
+                        "certificates": [cert.canonical_dict() for _, cert in certs],
+                        "issuer_address": self.wallets[issuer].get_address()
+                    }
+                    block = self._append_certificate_block(issuer, block_data)
+                    for row_number, cert in certs:
+                        cert.blockchain_hash = block.hash
+                        self._store_certificate(cert, block.index)
+                        results[row_number] = {
+                            "row": row_number,
+                            "success": True,
+                            "certificate_id": cert.cert_id,
+                            "blockchain_hash": block.hash
+                        }
+                
+                for row_number, _ in chunk:
+                    yield results[row_number]
+    
+    def _validate_bulk_row(self, row: Optional[dict]) -> Optional[str]:
+        if not isinstance(row, dict):
+            return "Malformed row"
+        missing = [field for field in BULK_REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            return f"Missing required fields: {', '.join(missing)}"
+        # JSONL rows may carry numbers or objects, which the search index cannot take
+        not_text = [field for field in BULK_REQUIRED_FIELDS if not isinstance(row[field], str)]
+        if not_text:
+            return f"Fields must be strings: {', '.join(not_text)}"
+        user = self.users.get(row["student_username"])
+        if not user or user["role"] != "student":
+            return "Student not found"
+        return None
+    
+    def _new_certificate(self, issuer: str, student_name: str, student_username: str,
+                         course: str, grade: str) -> Certificate:
+        cert_id = self._allocate_cert_id()
+        issue_date = datetime.now().strftime("%Y-%m-%d")
+        return Certificate(cert_id, student_name, student_username, course, grade, issue_date, issuer)
+    
+    def _allocate_cert_id(self) -> str:
+        with self._id_lock:
+            self.cert_counter += 1
+            return f"CERT-{self.cert_counter:04d}"
+    
+    def _sign_certificate(self, issuer: str, cert: Certificate):
+        started = time.perf_counter()
+        signature = self.wallets[issuer].sign_data(cert.canonical_json())
+        SIGNING_SECONDS.observe(time.perf_counter() - started)
+        cert.add_signature(issuer, signature)
+    
+    def _store_certificate(self, cert: Certificate, block_index: int):
+        with self._write_lock:
+            # Store certificate and the height of the block that carries it
+            self.certificate_blocks[cert.cert_id] = block_index
+            self.certificates[cert.cert_id] = cert
+            
+            # Update student certificates by username
+            if cert.student_username not in self.student_certificates:
+                self.student_certificates[cert.student_username] = []
+            self.student_certificates[cert.student_username].append(cert.cert_id)
+            
+            # Update issuer stats
+            issuer = cert.issuer
+            if issuer not in self.issuer_stats:
+                self.issuer_stats[issuer] = {"total_issued": 0, "by_student": {}}
+            self.issuer_stats[issuer]["total_issued"] += 1
+            if cert.student_name not in self.issuer_stats[issuer]["by_student"]:
+                self.issuer_stats[issuer]["by_student"][cert.student_name] = 0
+            self.issuer_stats[issuer]["by_student"][cert.student_name] += 1
+            
+            # Update analytics counters and search index
+            self.analytics.record_issue(cert)
+            self.search_index.add(cert)
+            self.student_versions.bump(cert.student_username)
+        self.events.publish("certificate_issued", cert_id=cert.cert_id, student=cert.student_username,
+                            issuer=cert.issuer, course=cert.course, height=block_index,
+                            ledger=cert.issuer if self.partitioned else "global")
     
     def get_certificate(self, cert_id: str) -> Optional[Certificate]:
         return self.certificates.get(cert_id)
     
+    def view_tag(self, student: Optional[str] = None, hr: Optional[str] = None,
+                 issuer: Optional[str] = None) -> str:
+        # Identifies the current version of a user's views. The global tip covers new
+        # blocks and revocations; the counters cover consents and partitioned issuance.
+        parts = [self.blockchain.get_latest_block().hash[:16]]
+        if student:
+            parts.append(f"s{self.student_versions.get(student)}")
+        if hr:
+            parts.append(f"h{self.hr_versions.get(hr)}")
+        if issuer and issuer in self.partitions:
+            parts.append(self.partitions[issuer].get_latest_block().hash[:16])
+        return "-".join(parts)
+    
     def get_student_certificates(self, student_username: str) -> List[Certificate]:
-        cert_ids = self.student_certificates.get(student_username, [])
+        cert_ids = list(self.student_certificates.get(student_username, []))
+        return [self.certificates[cid] for cid in cert_ids if cid in self.certificates]
+    
+    def get_student_certificates_page(self, student_username: str, cursor: Optional[str] = None,
+                                      limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Certificate], Optional[str]]:
+        cert_ids, next_cursor = paginate(self.student_certificates.get(student_username, []), cursor, limit)
+        return [self.certificates[cid] for cid in cert_ids if cid in self.certificates], next_cursor
+    
+    def search_certificates(self, course: Optional[str] = None, grade: Optional[str] = None,
+                            issuer: Optional[str] = None, date_from: Optional[str] = None,
+                            date_to: Optional[str] = None) -> List[Certificate]:
+        cert_ids = self.search_index.search(course, grade, issuer, date_from, date_to)
         return [self.certificates[cid] for cid in cert_ids if cid in self.certificates]
     
     def get_certificate_pdf_path(self, cert_id: str) -> Optional[str]:
         cert = self.certificates.get(cert_id)
-        if cert and cert.pdf_file_path and os.path.exists(cert.pdf_file_path):
-            return cert.pdf_file_path
+        if cert and cert.ipfs_hash:
+            return self.pdf_store.get_path(cert.ipfs_hash)
         return None
     
     def verify_certificate(self, cert_id: str) -> Tuple[bool, str]:
@@ -326,21 +1139,299 @@ class CertificateSystem:
         
         cert = self.certificates[cert_id]
         
-        # Verify blockchain
-        if not self.blockchain.is_chain_valid():
+        if self.is_revoked(cert_id):
+            return False, "Certificate has been revoked"
+        
+        # Verdicts are reusable until the chain tip or revocation state moves
+        ledger = self.ledger_for(cert.issuer)
+        cache_key = (cert_id, ledger.get_latest_block().hash, self.revocation_epoch)
+        verdict = self.verification_cache.get(cache_key)
+        if verdict is None:
+            verdict = self._verify_uncached(cert, ledger)
+            self.verification_cache.put(cache_key, verdict)
+        return verdict
+    
+    def verify_many(self, cert_ids: Iterable[str]) -> Iterator[Tuple[str, bool, str]]:
+        # Yields (cert_id, valid, message) in input order. Each ledger is validated at
+        # most once per batch; certificates are then found through the block index.
+        ledger_checks = {}
+        for cert_id in cert_ids:
+            cert = self.certificates.get(cert_id)
+            if cert is None:
+                yield cert_id, False, "Certificate not found"
+                continue
+            if self.is_revoked(cert_id):
+                yield cert_id, False, "Certificate has been revoked"
+                continue
+            
+            ledger = self.ledger_for(cert.issuer)
+            if ledger.partition not in ledger_checks:
+                tip_hash = ledger.get_latest_block().hash
+                ledger_checks[ledger.partition] = (tip_hash, ledger.is_chain_valid())
+            tip_hash, chain_valid = ledger_checks[ledger.partition]
+            
+            cache_key = (cert_id, tip_hash, self.revocation_epoch)
+            verdict = self.verification_cache.get(cache_key)
+            if verdict is None:
+                verdict = self._verify_uncached(cert, ledger, chain_valid)
+                self.verification_cache.put(cache_key, verdict)
+            yield (cert_id, *verdict)
+    
+    def _verify_uncached(self, cert: Certificate, ledger: Blockchain,
+                         chain_valid: Optional[bool] = None) -> Tuple[bool, str]:
+        # Verify blockchain, unless the caller already did
+        if chain_valid is None:
+            chain_valid = ledger.is_chain_valid()
+        if not chain_valid:
             return False, "Blockchain integrity compromised"
         
         # Find block with certificate
-        for block in self.blockchain.chain:
-            if block.data.get("type") == "certificate_issued" and \
-               block.data.get("certificate", {}).get("cert_id") == cert_id:
+        block_index = self.certificate_blocks.get(cert.cert_id)
+        if block_index is not None and block_index < len(ledger.chain):
+            block = ledger.chain[block_index]
+            if any(c.get("cert_id") == cert.cert_id for c in block_certificates(block)):
                 if block.hash == cert.blockchain_hash:
                     return True, "Certificate verified successfully"
         
         return False, "Certificate not found in blockchain"
 
+    # ==================== REVOCATION ====================
+    
+    def revoke_certificate(self, issuer: str, cert_id: str, reason: str = "") -> Tuple[bool, str]:
+        cert = self.certificates.get(cert_id)
+        if not cert:
+            return False, "Certificate not found"
+        if cert.issuer != issuer:
+            return False, "Only the issuing institution can revoke this certificate"
+        
+        # Revocations go on the global chain, which acts as the registry in partitioned mode too
+        with self._revoke_lock:
+            if self.is_revoked(cert_id):
+                return False, "Certificate already revoked"
+            
+            ordinal = certificate_ordinal(cert_id)
+            revoked_at = datetime.now().isoformat()
+            block_data = {
+                "type": "certificate_revoked",
+                "cert_id": cert_id,
+                "ordinal": ordinal,
+                "reason": reason,
+                "revoked_at": revoked_at,
+                "issuer_address": self.wallets[issuer].get_address(),
+                "signature": self.wallets[issuer].sign_data(f"revoke:{cert_id}:{reason}")[:64]
+            }
+            block = self.blockchain.add_block(block_data)
+            self._publish_block(block, self.blockchain)
+            self._apply_revocation(cert, block.index, reason, revoked_at)
+        
+        return True, f"Certificate {cert_id} revoked"
+    
+    def _apply_revocation(self, cert: Certificate, height: int, reason: str, revoked_at: str):
+        with self._write_lock:
+            self.revocations[cert.cert_id] = {
+                "reason": reason,
+                "revoked_at": revoked_at,
+                "height": height
+            }
+            self.revocation_bitmap.set(certificate_ordinal(cert.cert_id), height)
+            self.revocation_epoch += 1
+            self.analytics.record_revoke(cert)
+            self.search_index.remove(cert)
+            self.student_versions.bump(cert.student_username)
+        self.events.publish("certificate_revoked", cert_id=cert.cert_id, student=cert.student_username,
+                            issuer=cert.issuer, reason=reason, height=height, ledger="global")
+    
+    def is_revoked(self, cert_id: str) -> bool:
+        return self.revocation_bitmap.is_set(certificate_ordinal(cert_id))
+    
+    def revocation_delta(self, since_height: int = -1) -> dict:
+        entries = self.revocation_bitmap.delta_since(since_height)
+        return {
+            "since_height": since_height,
+            "tip_height": self.blockchain.get_latest_block().index,
+            "revocation_epoch": self.revocation_epoch,
+            "revoked": [
+                {"height": height, "ordinal": ordinal, "cert_id": f"CERT-{ordinal:04d}"}
+                for height, ordinal in entries
+            ]
+        }
+    
+    # ==================== SNAPSHOT / RESTORE ====================
+    
+    def snapshot(self, path: str) -> int:
+        # Layout: 8-byte magic, big-endian uint16 format version, zlib-compressed JSON state.
+        # Returns the height of the global chain captured in the snapshot.
+        with self._write_lock:
+            # Each chain is cut below its first block whose contents are not stored yet, so
+            # replaying the blocks above the returned height always brings them back
+            blocks = self.blockchain.chain[:self._indexed_height(self.blockchain) + 1]
+            partitions = {
+                issuer: ledger.chain[:self._indexed_height(ledger) + 1]
+                for issuer, ledger in self.partitions.items()
+            }
+            state = {
+                "users": self.users,
+                "wallets": {name: wallet.export_private_key() for name, wallet in self.wallets.items()},
+                "users_by_role": self.users_by_role,
+                "students_by_name": self.students_by_name,
+                "certificates": [
+                    {**cert.to_dict(), "pdf_file_path": cert.pdf_file_path}
+                    for cert in self.certificates.values()
+                ],
+                "student_certificates": self.student_certificates,
+                "certificate_blocks": self.certificate_blocks,
+                "issuer_stats": self.issuer_stats,
+                "analytics": self.analytics.to_state(),
+                "consents": self.consent_manager.export_consents(),
+                "cert_counter": self.cert_counter,
+                "revocation_epoch": self.revocation_epoch,
+                "revocations": self.revocations,
+                "revocation_bitmap": self.revocation_bitmap.to_state(),
+                "difficulty": self.blockchain.difficulty,
+                "blocks": [block.to_dict() for block in blocks],
+                "partitioned": self.partitioned,
+                "anchored_tips": self.anchored_tips,
+                "partitions": {
+                    issuer: [block.to_dict() for block in chain]
+                    for issuer, chain in partitions.items()
+                }
+            }
+            payload = zlib.compress(json.dumps(state, separators=(",", ":")).encode(), 6)
+        
+        # The snapshot holds private keys and passwords, so only the owner may read it
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return state["blocks"][-1]["index"]
+    
+    def _indexed_height(self, ledger: "Blockchain") -> int:
+        # Blocks are appended before their certificates or revocation are stored, so a
+        # writer can be between the two steps; returns the height just below the first
+        # such block. Called with _write_lock held.
+        chain = ledger.chain
+        for block in chain[1:]:
+            data = block.data
+            if data.get("type") == "certificate_revoked":
+                stored = data.get("cert_id") in self.revocations
+            else:
+                stored = all(cert.get("cert_id") in self.certificate_blocks for cert in block_certificates(block))
+            if not stored:
+                return block.index - 1
+        return len(chain) - 1
+    
+    def restore(self, path: str, tail_blocks: Iterable[dict] = ()) -> Tuple[bool, str]:
+        # Loads state and indexes directly; nothing is re-signed or re-mined.
+        # Blocks mined after the snapshot can be passed as tail_blocks (Block.to_dict() form)
+        # and are replayed.
+        with open(path, 'rb') as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+            if len(header) != SNAPSHOT_HEADER.size:
+                return False, "Not an EduLedger snapshot"
+            magic, version = SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC:
+                return False, "Not an EduLedger snapshot"
+            if version != SNAPSHOT_VERSION:
+                return False, f"Unsupported snapshot version {version}"
+            state = json.loads(zlib.decompress(f.read()))
+        
+        with self._write_lock:
+            blockchain = Blockchain()
+            blockchain.chain = [Block.from_dict(block) for block in state["blocks"]]
+            blockchain.difficulty = state["difficulty"]
+            
+            self.blockchain = blockchain
+            self.partitioned = state["partitioned"]
+            self.anchored_tips = state["anchored_tips"]
+            self.partitions = {}
+            for issuer, blocks in state["partitions"].items():
+                ledger = Blockchain(partition=issuer)
+                ledger.chain = [Block.from_dict(block) for block in blocks]
+                ledger.difficulty = blockchain.difficulty
+                self.partitions[issuer] = ledger
+            self.users = state["users"]
+            self.wallets = {name: Wallet.from_private_key(name, pem) for name, pem in state["wallets"].items()}
+            self.users_by_role = state["users_by_role"]
+            self.students_by_name = state["students_by_name"]
+            self.certificates = {}
+            for cert_data in state["certificates"]:
+                cert = Certificate.from_dict(cert_data)
+                self.certificates[cert.cert_id] = cert
+            self.student_certificates = state["student_certificates"]
+            self.certificate_blocks = state["certificate_blocks"]
+            self.issuer_stats = state["issuer_stats"]
+            self.analytics.load_state(state["analytics"])
+            self.consent_manager.load_consents(state["consents"])
+            self.cert_counter = state["cert_counter"]
+            self.revocation_epoch = state["revocation_epoch"]
+            self.revocations = state["revocations"]
+            self.revocation_bitmap.load_state(state["revocation_bitmap"])
+            self.search_index.rebuild(
+                cert for cert in self.certificates.values() if not self.is_revoked(cert.cert_id)
+            )
+            self.verification_cache.clear()
+        # Cursors from before the restore no longer describe this state
+        self.events.publish("reset", height=blockchain.get_latest_block().index)
+        
+        return self.replay_blocks(tail_blocks)
+    
+    def replay_blocks(self, blocks: Iterable[dict], partition: Optional[str] = None) -> Tuple[bool, str]:
+        # Append already-mined blocks on top of the current tip and index their certificates
+        replayed = 0
+        ledger = self.ledger_for(partition) if partition else self.blockchain
+        with self._write_lock:
+            for block_data in blocks:
+                block = Block.from_dict(block_data)
+                tip = ledger.get_latest_block()
+                if block.index != tip.index + 1 or block.previous_hash != tip.hash:
+                    return False, f"Block {block.index} does not extend the chain tip"
+                if block.hash != block.calculate_hash():
+                    return False, f"Block {block.index} hash mismatch"
+                ledger.chain.append(block)
+                self._publish_block(block, ledger)
+                
+                if block.data.get("type") == "certificate_revoked":
+                    cert = self.certificates.get(block.data["cert_id"])
+                    if cert and not self.is_revoked(cert.cert_id):
+                        self._apply_revocation(cert, block.index, block.data.get("reason", ""),
+                                               block.data.get("revoked_at", ""))
+                for cert_data in block_certificates(block):
+                    # A snapshot may already hold certificates from blocks above its height
+                    if cert_data["cert_id"] in self.certificates:
+                        continue
+                    cert = Certificate.from_dict(cert_data)
+                    cert.blockchain_hash = block.hash
+                    # The blob's reference was counted in the shared store when it was issued
+                    if cert.ipfs_hash:
+                        cert.pdf_file_path = self.pdf_store.blob_path(cert.ipfs_hash)
+                    self._store_certificate(cert, block.index)
+                    self.cert_counter = max(self.cert_counter, int(cert.cert_id.split("-")[-1]))
+                replayed += 1
+        
+        return True, f"Restored with {replayed} replayed block(s)"
+
 # ==================== GLOBAL SYSTEM INSTANCE ====================
-system = CertificateSystem()
+system = CertificateSystem(partitioned=os.environ.get("EDULEDGER_PARTITIONED") == "1")
+
+# Scrape-time views of the global instance
+Gauge("eduledger_chain_height", "Height of the chain tip, per ledger", ("ledger",),
+      function=lambda: {
+          ("global",): system.blockchain.get_latest_block().index,
+          **{(issuer,): ledger.get_latest_block().index for issuer, ledger in list(system.partitions.items())}
+      })
+Gauge("eduledger_certificates", "Certificates issued, including revoked ones",
+      function=lambda: len(system.certificates))
+Counter("eduledger_verification_cache_lookups_total", "Verification cache lookups, by result", ("result",),
+        function=lambda: {("hit",): system.verification_cache.hits, ("miss",): system.verification_cache.misses})
+Gauge("eduledger_verification_cache_hit_rate", "Share of verification cache lookups that hit",
+      function=lambda: system.verification_cache.stats()["hit_rate"])
+Gauge("eduledger_verification_cache_size", "Verdicts held in the verification cache",
+      function=lambda: system.verification_cache.stats()["size"])
+Gauge("eduledger_issuance_jobs", "Issuance jobs held, by status", ("status",),
+      function=lambda: {(status,): count for status, count in system.issuance_jobs.stats().items()})
 
 # ==================== GRADIO UI FUNCTIONS ====================
 
@@ -459,7 +1550,7 @@ def issue_new_certificate(student_name: str, existing_username: str, new_usernam
             result += f"IPFS Hash: {cert.ipfs_hash}\n"
             result += f"PDF Signature: {cert.pdf_signature[:64]}...\n"
         return result, get_issuer_wallet_info()
-    return "Error issuing certificate", ""
+    return f"Error issuing certificate: {cert_id}", ""
 
 def get_issuer_wallet_info():
     wallet = system.wallets["issuer324"]
@@ -471,16 +1562,30 @@ def get_issuer_wallet_info():
     info += f"Address: {wallet.get_address()}\n"
     info += f"Total Certificates Issued: {stats['total_issued']}\n\n"
     info += f"Certificates by Student:\n"
-    for student, count in stats['by_student'].items():
+    for student, count in dict(stats['by_student']).items():
         info += f"  - {student}: {count} certificate(s)\n"
     
     return info
 
+def revoke_issued_certificate(cert_id: str, reason: str):
+    if not cert_id:
+        return "Error: Please enter a certificate ID"
+    
+    success, message = system.revoke_certificate("issuer324", cert_id, reason or "")
+    if success:
+        result = f"Certificate Revoked Successfully\n"
+        result += f"{'='*50}\n"
+        result += f"Certificate ID: {cert_id}\n"
+        result += f"Reason: {reason or 'N/A'}\n"
+        result += f"Status: REVOKED\n"
+        return result
+    return f"Error: {message}"
+
 def get_all_issued_certificates():
     result = "All Issued Certificates\n"
     result += f"{'='*50}\n\n"
     
-    for cert_id, cert in system.certificates.items():
+    for cert_id, cert in list(system.certificates.items()):
         result += f"Certificate ID: {cert_id}\n"
         result += f"Student: {cert.student_name}\n"
         result += f"Course: {cert.course}\n"
@@ -488,6 +1593,8 @@ def get_all_issued_certificates():
         result += f"Issue Date: {cert.issue_date}\n"
         result += f"Blockchain Hash: {cert.blockchain_hash}\n"
         result += f"Signature: {cert.signatures[0]['signature']}\n"
+        if system.is_revoked(cert_id):
+            result += f"Status: REVOKED\n"
         result += f"{'-'*50}\n\n"
     
     if not system.certificates:
@@ -500,7 +1607,7 @@ def view_blockchain_issuer():
     result += f"{'='*50}\n"
     result += f"Total Blocks: {len(system.blockchain.chain)}\n"
     result += f"Difficulty: {system.blockchain.difficulty}\n"
-    result += f"Chain Valid: {system.blockchain.is_chain_valid()}\n\n"
+    result += f"Chain Valid: {system.blockchain.is_chain_valid_cached()}\n\n"
     
     for block in system.blockchain.chain:
         result += f"Block #{block.index}\n"
@@ -513,6 +1620,12 @@ def view_blockchain_issuer():
             cert_data = block.data.get('certificate', {})
             result += f"  Certificate ID: {cert_data.get('cert_id', 'N/A')}\n"
             result += f"  Student: {cert_data.get('student_name', 'N/A')}\n"
+        elif block.data.get('type') == 'certificate_batch_issued':
+            result += f"  Certificates: {len(block.data.get('certificates', []))}\n"
+        elif block.data.get('type') == 'certificate_revoked':
+            result += f"  Revoked Certificate: {block.data.get('cert_id', 'N/A')}\n"
+        elif block.data.get('type') == 'partition_anchor':
+            result += f"  Anchored Partitions: {', '.join(block.data.get('partitions', {}))}\n"
         result += f"{'-'*50}\n\n"
     
     return result
@@ -686,7 +1799,8 @@ def view_certificate_with_consent(cert_id: str):
     result = f"Certificate Verification\n"
     result += f"{'='*50}\n"
     result += f"Certificate ID: {cert_id}\n"
-    result += f"Consent Status: {'GRANTED' if has_consent else 'NOT GRANTED'}\n\n"
+    result += f"Consent Status: {'GRANTED' if has_consent else 'NOT GRANTED'}\n"
+    result += f"Revocation Status: {'REVOKED' if system.is_revoked(cert_id) else 'ACTIVE'}\n\n"
     
     pdf_file = None
     if has_consent:
@@ -730,7 +1844,7 @@ def get_accessible_certificates():
     result += f"{'='*50}\n\n"
     
     accessible = []
-    for cert_id, cert in system.certificates.items():
+    for cert_id, cert in list(system.certificates.items()):
         student_username = cert.student_username
         if system.consent_manager.check_consent(student_username, "HR023", cert_id):
             accessible.append(cert)
@@ -744,6 +1858,8 @@ def get_accessible_certificates():
         result += f"Blockchain Hash: {cert.blockchain_hash}\n"
         if cert.ipfs_hash:
             result += f"IPFS Hash: {cert.ipfs_hash}\n"
+        if system.is_revoked(cert.cert_id):
+            result += f"Status: REVOKED\n"
         result += f"{'-'*50}\n\n"
     
     if not accessible:
@@ -802,6 +1918,12 @@ def create_interface():
                 issue_btn = gr.Button("Issue Certificate", variant="primary")
                 issue_output = gr.Textbox(label="Result", lines=12, interactive=False)
             
+            with gr.Tab("Revoke Certificate"):
+                revoke_cert_input = gr.Textbox(label="Certificate ID", placeholder="Enter certificate ID")
+                revoke_reason_input = gr.Textbox(label="Reason", placeholder="Enter revocation reason")
+                revoke_cert_btn = gr.Button("Revoke Certificate", variant="secondary")
+                revoke_cert_output = gr.Textbox(label="Result", lines=6, interactive=False)
+            
             with gr.Tab("Wallet"):
                 wallet_btn = gr.Button("Refresh Wallet Info")
                 wallet_output = gr.Textbox(label="Wallet Information", lines=10, interactive=False)
@@ -924,6 +2046,7 @@ def create_interface():
             outputs=[issue_output, wallet_output]
         )
         
+        revoke_cert_btn.click(revoke_issued_certificate, inputs=[revoke_cert_input, revoke_reason_input], outputs=revoke_cert_output)
         wallet_btn.click(get_issuer_wallet_info, outputs=wallet_output)
         view_certs_btn.click(get_all_issued_certificates, outputs=certs_output)
         blockchain_btn.click(view_blockchain_issuer, outputs=blockchain_output)
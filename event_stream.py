@@ -0,0 +1,125 @@
+"""
+Event Stream for EduLedger Certificate Management System
+A bounded in-memory log of ledger events (new blocks, issuance, revocations, consent changes)
+that clients follow over server-sent events, resuming from the last event ID they saw
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+from response_encoding import dumps
+
+# Events kept for resuming clients; a cursor older than this gets a "reset" event
+EVENT_BUFFER_SIZE = 10000
+
+# Idle streams get a comment line this often so proxies keep the connection open
+KEEPALIVE_INTERVAL = 15.0
+
+# Reconnect delay suggested to EventSource clients, in milliseconds
+RETRY_MS = 3000
+
+EVENT_TYPES = ("block", "certificate_issued", "certificate_revoked", "consent_granted",
+               "consent_revoked", "reset")
+
+# Event types that name no user and so pass any username filter
+UNSCOPED_TYPES = {"block", "reset"}
+
+class EventLog:
+    # Event IDs are consecutive integers starting at 1, so a cursor maps straight to a
+    # position in the buffer
+    def __init__(self, size: int = EVENT_BUFFER_SIZE):
+        self.events = deque(maxlen=size)
+        self.last_id = 0
+        self._cond = threading.Condition()
+        self._listeners: List[Callable] = []
+
+    def publish(self, event_type: str, **fields) -> dict:
+        with self._cond:
+            self.last_id += 1
+            event = {"id": self.last_id, "type": event_type, "at": round(time.time(), 3), **fields}
+            self.events.append(event)
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+        return event
+
+    def since(self, event_id: int) -> Optional[List[dict]]:
+        # Events after event_id, or None when that cursor is no longer in the buffer
+        # (or was handed out by an earlier process) and the client has to reload
+        with self._cond:
+            if event_id > self.last_id:
+                return None
+            if not self.events:
+                return []
+            offset = event_id - self.events[0]["id"] + 1
+            if offset < 0:
+                return None
+            return list(itertools.islice(self.events, offset, None))
+
+    def wait(self, event_id: int, timeout: float) -> bool:
+        # Block until something newer than event_id is published; False on timeout
+        with self._cond:
+            return self._cond.wait_for(lambda: self.last_id != event_id, timeout)
+
+    def add_listener(self, listener: Callable):
+        # Called with no arguments from the publishing thread; for async servers that
+        # cannot block in wait()
+        with self._cond:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable):
+        with self._cond:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+class Subscription:
+    # One client's position in the log plus its filters. Events replayed from the chain
+    # (backlog) cover global blocks up to replayed_height, so live block events for
+    # those heights are dropped.
+    def __init__(self, log: EventLog, cursor: int, types: Optional[Iterable[str]] = None,
+                 username: Optional[str] = None, backlog: Iterable[dict] = (),
+                 replayed_height: int = -1):
+        self.log = log
+        self.cursor = cursor
+        self.types = set(types) if types else None
+        self.username = username
+        self.backlog = list(backlog)
+        self.replayed_height = replayed_height
+
+    def matches(self, event: dict) -> bool:
+        if event["type"] == "reset":
+            return True
+        if self.types is not None and event["type"] not in self.types:
+            return False
+        if (event["type"] == "block" and event.get("ledger") == "global"
+                and event["height"] <= self.replayed_height):
+            return False
+        if self.username is not None and event["type"] not in UNSCOPED_TYPES:
+            return self.username in (event.get("student"), event.get("issuer"), event.get("hr"))
+        return True
+
+    def take(self) -> List[dict]:
+        # Everything after the cursor that passes the filters, or a single reset event
+        # when the cursor has fallen out of the buffer
+        events = self.log.since(self.cursor)
+        if events is None:
+            self.cursor = self.log.last_id
+            return [{"id": self.cursor, "type": "reset"}]
+        if events:
+            self.cursor = events[-1]["id"]
+        return [event for event in events if self.matches(event)]
+
+    def wait(self, timeout: float) -> bool:
+        return self.log.wait(self.cursor, timeout)
+
+def format_event(event: dict) -> bytes:
+    # One SSE message; replayed chain events carry no id and so do not move the client's cursor
+    head = f"id: {event['id']}\n" if "id" in event else ""
+    return f"{head}event: {event['type']}\n".encode() + b"data: " + dumps(event) + b"\n\n"
+
+PREAMBLE = f"retry: {RETRY_MS}\n\n".encode()
+KEEPALIVE = b": keepalive\n\n"
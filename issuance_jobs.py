@@ -0,0 +1,172 @@
+"""
+Issuance Jobs for EduLedger Certificate Management System
+Certificate issuance queued to a worker pool and polled by job ID, with idempotency keys so a
+retried submission never issues the same certificate twice
+"""
+
+import hashlib
+import json
+import secrets
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+# Jobs mine concurrently with synchronous issuance, so keep the pool small
+JOB_WORKERS = 2
+
+# Submissions beyond this many unfinished jobs are refused rather than queued
+MAX_PENDING_JOBS = 1000
+
+# Finished jobs, and the idempotency keys pointing at them, are kept this long
+JOB_RETENTION = 24 * 60 * 60
+
+# Uploaded PDFs are copied off the request before it returns; larger ones go to disk
+PDF_SPOOL_SIZE = 1024 * 1024
+
+PENDING = "pending"
+MINED = "mined"
+FAILED = "failed"
+
+# Certificate fields a job carries, and that make up its fingerprint
+JOB_FIELDS = ("student_name", "student_username", "course", "grade")
+
+class IdempotencyConflict(Exception):
+    # The key was already used for a different request
+    pass
+
+class QueueFull(Exception):
+    pass
+
+class IssuanceJob:
+    def __init__(self, job_id: str, issuer: str, fingerprint: str, idempotency_key: Optional[str]):
+        self.job_id = job_id
+        self.issuer = issuer
+        self.fingerprint = fingerprint
+        self.idempotency_key = idempotency_key
+        self.status = PENDING
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.certificate_id: Optional[str] = None
+        self.block_hash: Optional[str] = None
+        self.block_height: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "issuer": self.issuer,
+            "submitted_at": datetime.fromtimestamp(self.submitted_at).isoformat(),
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            "certificate_id": self.certificate_id,
+            "block_hash": self.block_hash,
+            "block_height": self.block_height,
+            "error": self.error
+        }
+
+def spool_pdf(pdf_file) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    # Copy an upload into a spooled file that outlives the request; returns (file, SHA-256)
+    spool = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_SIZE)
+    digest = hashlib.sha256()
+    while True:
+        chunk = pdf_file.read(64 * 1024)
+        if not chunk:
+            break
+        digest.update(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+class IssuanceJobs:
+    # `issue(issuer, fields, pdf_file)` does the actual issuance and returns
+    # {"certificate_id", "block_hash", "block_height"}; it runs on the worker pool.
+    def __init__(self, issue: Callable[[str, dict, Optional[object]], dict], workers: int = JOB_WORKERS,
+                 max_pending: int = MAX_PENDING_JOBS, retention: float = JOB_RETENTION):
+        self.issue = issue
+        self.max_pending = max_pending
+        self.retention = retention
+        self.jobs: "OrderedDict[str, IssuanceJob]" = OrderedDict()
+        self.keys: Dict[Tuple[str, str], str] = {}
+        self.counts = {PENDING: 0, MINED: 0, FAILED: 0}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="issuance-job")
+
+    def submit(self, issuer: str, fields: dict, pdf_file=None,
+               idempotency_key: Optional[str] = None) -> Tuple[IssuanceJob, bool]:
+        # Returns (job, created). Resubmitting a key returns its job unchanged unless that
+        # job failed: a failed job committed nothing, so the key is free to try again.
+        fields = {name: fields.get(name) for name in JOB_FIELDS}
+        spool, pdf_digest = spool_pdf(pdf_file) if pdf_file is not None else (None, "")
+        fingerprint = hashlib.sha256(
+            json.dumps([issuer, fields, pdf_digest], sort_keys=True).encode()
+        ).hexdigest()
+
+        with self._lock:
+            self._purge_expired()
+            if idempotency_key:
+                existing = self.jobs.get(self.keys.get((issuer, idempotency_key), ""))
+                if existing is not None and existing.fingerprint != fingerprint:
+                    self._discard(spool)
+                    raise IdempotencyConflict("Idempotency key was already used for a different request")
+                if existing is not None and existing.status != FAILED:
+                    self._discard(spool)
+                    return existing, False
+            if self.counts[PENDING] >= self.max_pending:
+                self._discard(spool)
+                raise QueueFull("Too many issuance jobs pending")
+
+            job = IssuanceJob("JOB-" + secrets.token_hex(8), issuer, fingerprint, idempotency_key)
+            self.jobs[job.job_id] = job
+            if idempotency_key:
+                self.keys[(issuer, idempotency_key)] = job.job_id
+            self.counts[PENDING] += 1
+
+        self._executor.submit(self._run, job, fields, spool)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[IssuanceJob]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> dict:
+        return dict(self.counts)
+
+    def _run(self, job: IssuanceJob, fields: dict, pdf_file):
+        try:
+            result = self.issue(job.issuer, fields, pdf_file)
+            status = MINED
+        except Exception as e:
+            result = {"error": str(e)}
+            status = FAILED
+        finally:
+            self._discard(pdf_file)
+
+        with self._lock:
+            job.certificate_id = result.get("certificate_id")
+            job.block_hash = result.get("block_hash")
+            job.block_height = result.get("block_height")
+            job.error = result.get("error")
+            job.finished_at = time.time()
+            job.status = status
+            self.counts[PENDING] -= 1
+            self.counts[status] += 1
+
+    def _purge_expired(self):
+        # Jobs are kept in submission order, so expired ones are at the front
+        cutoff = time.time() - self.retention
+        while self.jobs:
+            job = next(iter(self.jobs.values()))
+            if job.status == PENDING or job.finished_at > cutoff:
+                break
+            del self.jobs[job.job_id]
+            self.counts[job.status] -= 1
+            if job.idempotency_key and self.keys.get((job.issuer, job.idempotency_key)) == job.job_id:
+                del self.keys[(job.issuer, job.idempotency_key)]
+
+    @staticmethod
+    def _discard(pdf_file):
+        if pdf_file is not None:
+            pdf_file.close()
@@ -0,0 +1,114 @@
+"""
+Response Encoding for EduLedger Certificate Management System
+Pluggable JSON encoders (orjson when installed, else the standard library) with pre-encoded
+fragments, and negotiated gzip/zstd compression of large response bodies
+"""
+
+import gzip
+import json
+import os
+import re
+from typing import Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ==================== JSON ENCODING ====================
+
+class Fragment:
+    # Already-encoded JSON (e.g. a certificate's cached canonical_json), spliced into
+    # the output verbatim instead of being encoded again
+    __slots__ = ("json",)
+
+    def __init__(self, json_text: str):
+        self.json = json_text
+
+def json_fragment(json_text: str, **extra) -> Fragment:
+    # Extend an encoded JSON object with extra keys without decoding it
+    if not extra:
+        return Fragment(json_text)
+    tail = dumps(extra).decode()[1:]
+    if json_text.rstrip() == "{}":
+        return Fragment("{" + tail)
+    return Fragment(json_text.rstrip()[:-1] + "," + tail)
+
+def _stdlib_dumps(obj, default: Callable) -> bytes:
+    return json.dumps(obj, default=default, separators=(",", ":")).encode()
+
+def _orjson_dumps(obj, default: Callable) -> bytes:
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+# Encoders by name; each takes (obj, default) and returns UTF-8 bytes
+BACKENDS: Dict[str, Callable] = {"json": _stdlib_dumps}
+if orjson is not None:
+    BACKENDS["orjson"] = _orjson_dumps
+
+# EDULEDGER_JSON_BACKEND picks one explicitly; an unavailable choice falls back to the default
+backend = os.environ.get("EDULEDGER_JSON_BACKEND", "")
+if backend not in BACKENDS:
+    backend = "orjson" if orjson is not None else "json"
+
+def set_backend(name: str):
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    backend = name
+
+def dumps(obj) -> bytes:
+    # Fragments are encoded as placeholder strings and swapped in afterwards. Both
+    # encoders escape NUL as \u0000, and a per-call nonce keeps ordinary strings from
+    # ever matching a placeholder.
+    fragments = []
+    nonce = os.urandom(4).hex()
+
+    def default(value):
+        if isinstance(value, Fragment):
+            fragments.append(value.json)
+            return f"\0{nonce}:{len(fragments) - 1}\0"
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    encoded = BACKENDS[backend](obj, default)
+    if not fragments:
+        return encoded
+    placeholder = re.compile(rb'"\\u0000' + nonce.encode() + rb':(\d+)\\u0000"')
+    return placeholder.sub(lambda match: fragments[int(match.group(1))].encode(), encoded)
+
+# ==================== COMPRESSION ====================
+
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    # Prefer zstd when the client accepts it and zstandard is installed, else gzip
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    if zstandard is not None and "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def should_compress(content_type: Optional[str], content_encoding: Optional[str], size: int) -> bool:
+    # Only whole JSON bodies; files and streams are left alone
+    return (bool(content_type) and content_type.startswith("application/json")
+            and not content_encoding and size >= COMPRESS_MIN_SIZE)
@@ -0,0 +1,106 @@
+"""
+Certificate Search Index for EduLedger Certificate Management System
+Inverted indexes on course tokens, grade and issuer, plus a sorted issue-date index for range queries
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+# Runs of Unicode letters and digits, so accented and non-Latin course names are indexed too
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+def normalize_term(text: str) -> str:
+    return text.strip().casefold()
+
+class CertificateSearchIndex:
+    def __init__(self):
+        self.course_tokens: Dict[str, Set[str]] = {}
+        self.grades: Dict[str, Set[str]] = {}
+        self.issuers: Dict[str, Set[str]] = {}
+        self.dates: List[tuple] = []
+        self.cert_dates: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, cert):
+        with self._lock:
+            if cert.cert_id in self.cert_dates:
+                return
+            for token in set(tokenize(cert.course)):
+                self.course_tokens.setdefault(token, set()).add(cert.cert_id)
+            self.grades.setdefault(normalize_term(cert.grade), set()).add(cert.cert_id)
+            self.issuers.setdefault(cert.issuer, set()).add(cert.cert_id)
+            bisect.insort(self.dates, (cert.issue_date, cert.cert_id))
+            self.cert_dates[cert.cert_id] = cert.issue_date
+
+    def remove(self, cert):
+        with self._lock:
+            if self.cert_dates.pop(cert.cert_id, None) is None:
+                return
+            for token in set(tokenize(cert.course)):
+                self._discard(self.course_tokens, token, cert.cert_id)
+            self._discard(self.grades, normalize_term(cert.grade), cert.cert_id)
+            self._discard(self.issuers, cert.issuer, cert.cert_id)
+            position = bisect.bisect_left(self.dates, (cert.issue_date, cert.cert_id))
+            if position < len(self.dates) and self.dates[position] == (cert.issue_date, cert.cert_id):
+                del self.dates[position]
+
+    def rebuild(self, certs: Iterable):
+        with self._lock:
+            self.course_tokens, self.grades, self.issuers = {}, {}, {}
+            self.dates, self.cert_dates = [], {}
+        for cert in certs:
+            self.add(cert)
+
+    def search(self, course: Optional[str] = None, grade: Optional[str] = None,
+               issuer: Optional[str] = None, date_from: Optional[str] = None,
+               date_to: Optional[str] = None) -> List[str]:
+        # Returns matching certificate IDs ordered by issue date. Every course token, the grade
+        # and the issuer each contribute a posting set; intersection starts from the smallest.
+        with self._lock:
+            postings = []
+            if course:
+                tokens = tokenize(course)
+                if not tokens:
+                    # e.g. "!!!": nothing can match, rather than dropping the filter
+                    return []
+                postings.extend(self.course_tokens.get(token, set()) for token in tokens)
+            if grade:
+                postings.append(self.grades.get(normalize_term(grade), set()))
+            if issuer:
+                postings.append(self.issuers.get(issuer, set()))
+
+            has_range = date_from is not None or date_to is not None
+            start = bisect.bisect_left(self.dates, (date_from,)) if date_from else 0
+            end = bisect.bisect_right(self.dates, (date_to, "\uffff")) if date_to else len(self.dates)
+
+            if not postings:
+                return [cert_id for _, cert_id in self.dates[start:end]]
+
+            postings.sort(key=len)
+            if has_range and end - start < len(postings[0]):
+                # The date range is the most selective filter, so walk it
+                candidates = [cert_id for _, cert_id in self.dates[start:end]]
+            else:
+                candidates = postings[0]
+                postings = postings[1:]
+            matches = [cert_id for cert_id in candidates if all(cert_id in p for p in postings)]
+
+            if has_range:
+                matches = [cert_id for cert_id in matches
+                           if (not date_from or self.cert_dates[cert_id] >= date_from)
+                           and (not date_to or self.cert_dates[cert_id] <= date_to)]
+            return sorted(matches, key=lambda cert_id: (self.cert_dates[cert_id], cert_id))
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, cert_id: str):
+        postings = index.get(key)
+        if postings is not None:
+            postings.discard(cert_id)
+            if not postings:
+                del index[key]
@@ -0,0 +1,127 @@
+"""
+Session Store for EduLedger Certificate Management System
+Opaque bearer tokens with a TTL, kept in SQLite so every worker process on the host shares them
+"""
+
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Sessions last 8 hours from login
+SESSION_TTL = 8 * 60 * 60
+
+# Sessions are re-read from SQLite at least this often, so a logout in another
+# worker process takes effect within this many seconds
+LOCAL_CACHE_TTL = 5.0
+LOCAL_CACHE_SIZE = 10000
+
+# Expired rows are swept every this many logins
+PURGE_EVERY = 100
+
+DEFAULT_DB_PATH = os.environ.get("EDULEDGER_SESSION_DB", "/tmp/eduledger_sessions.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token_hash TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at);
+"""
+
+def hash_token(token: str) -> str:
+    # Only token hashes are stored, so the database file alone cannot be used to log in
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class SessionStore:
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttl: float = SESSION_TTL,
+                 cache_ttl: float = LOCAL_CACHE_TTL, cache_size: int = LOCAL_CACHE_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._logins = 0
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers in other processes proceed during writes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, username: str, role: str, name: str) -> Tuple[str, float]:
+        # Returns (token, expires_at)
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (token_hash, username, role, name, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (hash_token(token), username, role, name, now, expires_at)
+            )
+        self._logins += 1
+        if self._logins % PURGE_EVERY == 0:
+            self.purge_expired()
+        return token, expires_at
+
+    def get(self, token: str) -> Optional[dict]:
+        # Returns {"username", "role", "name", "expires_at"} for a live session, else None
+        if not token:
+            return None
+        key = hash_token(token)
+        now = time.time()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                session, fresh_until = entry
+                if now < fresh_until:
+                    self._cache.move_to_end(key)
+                    return session
+                del self._cache[key]
+
+        row = self._connect().execute(
+            "SELECT username, role, name, expires_at FROM sessions WHERE token_hash = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row["expires_at"] <= now:
+            self._delete(key)
+            return None
+
+        session = dict(row)
+        with self._cache_lock:
+            self._cache[key] = (session, min(now + self.cache_ttl, session["expires_at"]))
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return session
+
+    def revoke(self, token: str) -> bool:
+        return self._delete(hash_token(token)) > 0
+
+    def purge_expired(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def _delete(self, key: str) -> int:
+        with self._cache_lock:
+            self._cache.pop(key, None)
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM sessions WHERE token_hash = ?", (key,)).rowcount